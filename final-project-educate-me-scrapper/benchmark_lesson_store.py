@@ -0,0 +1,86 @@
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from lesson_store import ChunkedLessonStore, FileLessonStore
+
+LESSON_COUNT = 100
+SHELL_SCRIPT_SIZE = 1_500_000
+SHELL_STYLE_SIZE = 200_000
+LESSON_BODY_SIZE = 40_000
+WORDS = ['const', 'return', 'function', 'props', 'state', 'lesson', 'video', 'course', 'render', 'module', 'export',
+         'null', 'true', 'false', 'this', 'value', 'children', 'className', 'onClick', 'useEffect', 'dispatch']
+
+
+def render_script(rng: random.Random, size: int) -> str:
+    # Minified bundle: long lines of statements and blocks, hardly any newlines
+    parts = []
+    length = 0
+    while length < size:
+        statement = f'{rng.choice(WORDS)}.{rng.choice(WORDS)}{rng.randrange(10_000)}=function(e,t){{return e.{rng.choice(WORDS)}(t)}};'
+        parts.append(statement)
+        length += len(statement)
+    return ''.join(parts)
+
+
+def render_style(rng: random.Random, size: int) -> str:
+    parts = []
+    length = 0
+    while length < size:
+        rule = f'.css-{rng.randrange(16 ** 6):06x}{{display:flex;margin:{rng.randrange(32)}px;color:#{rng.randrange(16 ** 6):06x}}}'
+        parts.append(rule)
+        length += len(rule)
+    return ''.join(parts)
+
+
+def render_lesson(shell_script: str, shell_style: str, lesson_index: int) -> str:
+    # The shell is shared, but every page source starts with a per-request nonce and ends with lesson content
+    rng = random.Random(lesson_index)
+    paragraphs = []
+    length = 0
+    while length < LESSON_BODY_SIZE:
+        paragraph = f'<p class="lesson-text">{" ".join(rng.choice(WORDS) for _ in range(40))}</p>\n'
+        paragraphs.append(paragraph)
+        length += len(paragraph)
+    return (f'<html><head><meta name="csrf-token" content="{rng.randrange(16 ** 32):032x}">'
+            f'<script nonce="{rng.randrange(16 ** 16):016x}">{shell_script}</script><style>{shell_style}</style></head>'
+            f'<body><div id="root"><h1>Lesson {lesson_index}</h1>{"".join(paragraphs)}'
+            f'<video src="/media/lesson-{lesson_index}.mp4"></video></div></body></html>')
+
+
+def measure_store(label: str, store, lessons: list[bytes]) -> None:
+    start_time = time.perf_counter()
+    for index, content in enumerate(lessons):
+        store.write(str(index), content)
+    write_time = time.perf_counter() - start_time
+
+    start_time = time.perf_counter()
+    for index, content in enumerate(lessons):
+        if store.read(str(index)) != content:
+            raise AssertionError(f"{label} returned a different lesson {index}")
+    read_time = time.perf_counter() - start_time
+
+    logical_bytes = sum(len(content) for content in lessons)
+    print(f"### {label}: {store.disk_bytes() / 1024 / 1024:.1f} MiB on disk for "
+          f"{logical_bytes / 1024 / 1024:.1f} MiB of lessons, write {write_time:.2f}s, read {read_time:.2f}s")
+
+
+if __name__ == '__main__':
+    lesson_count = int(sys.argv[1]) if len(sys.argv) > 1 else LESSON_COUNT
+    rng = random.Random(0)
+    shell_script = render_script(rng, SHELL_SCRIPT_SIZE)
+    shell_style = render_style(rng, SHELL_STYLE_SIZE)
+    lessons = [render_lesson(shell_script, shell_style, i).encode('utf-8') for i in range(lesson_count)]
+
+    with tempfile.TemporaryDirectory() as folder:
+        measure_store('one file per lesson', FileLessonStore(str(Path(folder) / 'files')), lessons)
+        store = ChunkedLessonStore(str(Path(folder) / 'chunks' / 'lessons.db'))
+        try:
+            measure_store('deduplicated chunks', store, lessons)
+            stats = store.stats()
+            print(f"{stats['chunks']} unique chunks, dedup ratio {stats['dedup_ratio']:.1f}x, "
+                  f"{stats['compression_ratio']:.1f}x with compression")
+        finally:
+            store.close()
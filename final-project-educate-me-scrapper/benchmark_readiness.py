@@ -0,0 +1,54 @@
+import json
+import statistics
+import sys
+import tempfile
+import time
+
+import config
+from chrome_facade import prepare_driver
+from lesson_manifest import LessonManifest
+from main import build_lesson_url, download_lesson, open_course
+from tracing import TRACER
+
+SAMPLE_SIZE = 10
+RESULTS_FILE_PATH = 'readiness_results.json'
+# The first profile is the behavior before the readiness subsystem: URL change only, every resource loaded
+PROFILES = [
+    ('url_change, all resources', {'ready_condition': 'url_change', 'block_resources': False}),
+    ('mutation_idle, blocked resources', {'ready_condition': 'mutation_idle', 'block_resources': True}),
+    ('network_idle, blocked resources', {'ready_condition': 'network_idle', 'block_resources': True}),
+]
+
+
+def measure_profile(label: str, profile: dict, sample_size: int) -> list[float]:
+    driver = prepare_driver(**profile)
+    try:
+        course_url, lesson_ids = open_course(driver)
+        with tempfile.TemporaryDirectory() as lessons_folder:
+            manifest = LessonManifest(lessons_folder)
+            wall_times = []
+            for index, lesson_id in enumerate(lesson_ids[:sample_size]):
+                start_time = time.perf_counter()
+                download_lesson(driver, manifest, build_lesson_url(course_url, lesson_id), lesson_id, index)
+                wall_times.append(time.perf_counter() - start_time)
+    finally:
+        driver.quit()
+    print(f"### {label}: {len(wall_times)} lessons, mean {statistics.mean(wall_times):.2f}s, "
+          f"p50 {statistics.median(wall_times):.2f}s, max {max(wall_times):.2f}s per lesson")
+    return wall_times
+
+
+if __name__ == '__main__':
+    if not config.LOGIN or not config.PASSWORD or not config.COURSE_TO_DOWNLOAD:
+        raise ValueError("Please provide LOGIN, PASSWORD and COURSE_TO_DOWNLOAD in config.py")
+    sample_size = int(sys.argv[1]) if len(sys.argv) > 1 else SAMPLE_SIZE
+    TRACER.verbose = False
+    results = {label: measure_profile(label, profile, sample_size) for label, profile in PROFILES}
+    baseline = statistics.mean(results[PROFILES[0][0]])
+    for label, wall_times in results.items():
+        print(f"{label:<36} {baseline / statistics.mean(wall_times):.2f}x the per-lesson speed of the baseline")
+    with open(RESULTS_FILE_PATH, 'w', encoding='utf-8') as file:
+        json.dump({label: {'wall_times': wall_times, 'mean': statistics.mean(wall_times),
+                           'p50': statistics.median(wall_times), 'max': max(wall_times)}
+                   for label, wall_times in results.items()}, file, indent=2)
+    print(f"Per-lesson wall times written to {RESULTS_FILE_PATH}")
@@ -1,26 +1,125 @@
-from selenium.common import StaleElementReferenceException
+import json
+import time
+import weakref
+
+from selenium.common import StaleElementReferenceException, TimeoutException
 from selenium.webdriver.chrome import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chromium.webdriver import ChromiumDriver
+from selenium.webdriver.common.by import By
 from selenium.webdriver.support.wait import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
-def prepare_driver() -> ChromiumDriver:
+from tracing import traced
+
+WAIT_TIMEOUT = 10
+POLL_FREQUENCY = 0.05
+# WebDriverWait's default, kept for the url_change condition so it still behaves as before
+LEGACY_POLL_FREQUENCY = 0.5
+
+# What "the page is ready" means after a navigation:
+#   url_change    - only wait for the URL to change and poll for elements (the original behavior)
+#   mutation_idle - the DOM has not changed for READY_QUIET_PERIOD, observed by an injected MutationObserver
+#   network_idle  - at most NETWORK_IDLE_MAX_IN_FLIGHT requests for READY_QUIET_PERIOD, from CDP network events
+# A page that never goes quiet (a playing video, an animated widget) is treated as ready after WAIT_TIMEOUT
+READY_CONDITION = 'url_change'
+READY_CONDITIONS = ('url_change', 'mutation_idle', 'network_idle')
+READY_QUIET_PERIOD = 0.3
+# Like Puppeteer's networkidle2, tolerates long-polling connections that never finish
+NETWORK_IDLE_MAX_IN_FLIGHT = 2
+
+BLOCK_RESOURCES = True
+# URL patterns for Network.setBlockedURLs. Media is left alone: lessons wait for their video element
+BLOCKED_URL_PATTERNS = [
+    '*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.avif', '*.svg', '*.ico',
+    '*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot',
+    '*google-analytics.com*', '*googletagmanager.com*', '*doubleclick.net*', '*facebook.net*',
+    '*hotjar.com*', '*segment.io*', '*segment.com*', '*intercom.io*', '*mixpanel.com*', '*clarity.ms*',
+]
+
+WAIT_FOR_MUTATION_IDLE_SCRIPT = """
+const [quietPeriod, timeout, callback] = arguments;
+let quietTimer = null;
+const finish = (ready) => {
+    observer.disconnect();
+    clearTimeout(quietTimer);
+    clearTimeout(deadline);
+    callback(ready);
+};
+const arm = () => {
+    clearTimeout(quietTimer);
+    quietTimer = setTimeout(() => document.readyState === 'complete' ? finish(true) : arm(), quietPeriod);
+};
+const observer = new MutationObserver(arm);
+const deadline = setTimeout(() => finish(false), timeout);
+observer.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+arm();
+"""
+
+# Resolves as soon as a mutation makes the query match, instead of polling find_elements from Python
+WAIT_FOR_ELEMENTS_SCRIPT = """
+const [by, query, timeout, callback] = arguments;
+const count = () => {
+    if (by === 'xpath') {
+        return document.evaluate(query, document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null).snapshotLength;
+    }
+    if (by === 'tag name') return document.getElementsByTagName(query).length;
+    if (by === 'id') return document.getElementById(query) ? 1 : 0;
+    return document.querySelectorAll(query).length;
+};
+if (count() > 0) {
+    callback(true);
+} else {
+    const observer = new MutationObserver(() => {
+        if (count() > 0) {
+            observer.disconnect();
+            clearTimeout(deadline);
+            callback(true);
+        }
+    });
+    const deadline = setTimeout(() => {
+        observer.disconnect();
+        callback(false);
+    }, timeout);
+    observer.observe(document, {childList: true, subtree: true, attributes: true});
+}
+"""
+OBSERVABLE_LOCATORS = {By.XPATH, By.TAG_NAME, By.ID, By.CSS_SELECTOR}
+
+# Ready condition of every driver created by prepare_driver, kept here instead of on the driver object
+_ready_conditions = weakref.WeakKeyDictionary()
+
+
+@traced
+def prepare_driver(ready_condition: str = READY_CONDITION, block_resources: bool = BLOCK_RESOURCES) -> ChromiumDriver:
     print("Preparing the Chrome driver")
+    if ready_condition not in READY_CONDITIONS:
+        raise ValueError(f"Unknown ready condition {ready_condition}, expected one of {READY_CONDITIONS}")
     chrome_options = Options()
     chrome_options.add_argument("--disable-blink-features=AutomationControlled")
     chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])
     chrome_options.add_experimental_option('useAutomationExtension', False)
+    if ready_condition == 'network_idle':
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
 
     user_agent = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) "
                   "Chrome/126.0.0.0 Safari/537.36")
     chrome_options.add_argument(f'user-agent={user_agent}')
     service = Service('./chromedriver')
 
+    driver = webdriver.ChromiumDriver(service=service, options=chrome_options)
+    _ready_conditions[driver] = ready_condition
+    driver.set_script_timeout(WAIT_TIMEOUT + 1)
+    if block_resources:
+        driver.execute_cdp_cmd('Network.enable', {})
+        driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': BLOCKED_URL_PATTERNS})
+        print(f"Blocking {len(BLOCKED_URL_PATTERNS)} resource URL patterns")
     print("Chrome driver prepared successfully")
-    return webdriver.ChromiumDriver(service=service, options=chrome_options)
+    return driver
 
+
+@traced
 def navigate_to_page(driver, url):
     if driver.current_url == url :
         print(f"Already on the URL: {url}")
@@ -33,25 +132,96 @@ def navigate_to_page(driver, url):
 
 
 
+@traced
+def copy_session(source_driver, target_driver, url):
+    # Cookies can only be set for the domain the target is on, so it opens the site before injecting them
+    print(f"Copying the signed-in session to another driver for {url}")
+    navigate_to_page(target_driver, url)
+    for cookie in source_driver.get_cookies():
+        target_driver.add_cookie(cookie)
+    local_storage = source_driver.execute_script("return Object.assign({}, window.localStorage);")
+    target_driver.execute_script(
+        "for (const [key, value] of Object.entries(arguments[0])) window.localStorage.setItem(key, value);",
+        local_storage)
+    target_driver.refresh()
+    print(f"Copied {len(local_storage)} local storage entries and the cookies")
+
 
+def get_ready_condition(driver) -> str:
+    return _ready_conditions.get(driver, READY_CONDITION)
+
+
+def is_event_driven(driver) -> bool:
+    return get_ready_condition(driver) != 'url_change'
+
+
+def create_wait(driver) -> WebDriverWait:
+    return WebDriverWait(driver, WAIT_TIMEOUT,
+                         poll_frequency=POLL_FREQUENCY if is_event_driven(driver) else LEGACY_POLL_FREQUENCY)
+
+
+@traced
 def find_elements_with_wait(driver, by: str, query: str):
     print(f"Waiting for elements by {by} with query: {query}")
-    elements = WebDriverWait(driver, 10).until(
-        EC.presence_of_all_elements_located((by, query))
-    )
+    if by in OBSERVABLE_LOCATORS and is_event_driven(driver):
+        if not driver.execute_async_script(WAIT_FOR_ELEMENTS_SCRIPT, by, query, WAIT_TIMEOUT * 1000):
+            raise TimeoutException(f"No elements found for {query} within {WAIT_TIMEOUT} seconds")
+        elements = driver.find_elements(by, query)
+    else:
+        elements = create_wait(driver).until(
+            EC.presence_of_all_elements_located((by, query))
+        )
     if not elements:
         raise StaleElementReferenceException(f"Element not found for {query}")
     print(f"Found {len(elements)} elements for {query}")
     return elements
 
 
+@traced
+def wait_for_mutation_idle(driver) -> bool:
+    if not driver.execute_async_script(WAIT_FOR_MUTATION_IDLE_SCRIPT, READY_QUIET_PERIOD * 1000, WAIT_TIMEOUT * 1000):
+        print(f"DOM kept changing for {WAIT_TIMEOUT} seconds, continuing")
+        return False
+    return True
+
+
+@traced
+def wait_for_network_idle(driver) -> bool:
+    # Replays the Network.* CDP events Chrome writes to the performance log and tracks requests in flight
+    in_flight = set()
+    idle_since = time.monotonic()
+    deadline = idle_since + WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        for entry in driver.get_log('performance'):
+            message = json.loads(entry['message'])['message']
+            if message['method'] == 'Network.requestWillBeSent':
+                in_flight.add(message['params']['requestId'])
+            elif message['method'] in ('Network.loadingFinished', 'Network.loadingFailed'):
+                in_flight.discard(message['params']['requestId'])
+            else:
+                continue
+            idle_since = time.monotonic()
+        if len(in_flight) <= NETWORK_IDLE_MAX_IN_FLIGHT and time.monotonic() - idle_since >= READY_QUIET_PERIOD:
+            return True
+        time.sleep(POLL_FREQUENCY)
+    print(f"{len(in_flight)} requests still in flight after {WAIT_TIMEOUT} seconds, continuing")
+    return False
+
+
+@traced
 def wait_for_page_load(driver, url_before_action):
     print("Waiting for the page to load")
-    wait = WebDriverWait(driver, 10)
+    wait = create_wait(driver)
 
+    @traced
     def wait_for_url_to_change():
         wait.until(EC.url_changes(url_before_action))
         print("URL has changed")
 
     wait_for_url_to_change()
-    print("Page load completed")
\ No newline at end of file
+    ready_condition = get_ready_condition(driver)
+    if ready_condition == 'mutation_idle':
+        wait_for_mutation_idle(driver)
+    elif ready_condition == 'network_idle':
+        wait_for_network_idle(driver)
+    print("Page load completed")
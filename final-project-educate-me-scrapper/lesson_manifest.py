@@ -0,0 +1,47 @@
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+from lesson_store import FileLessonStore, write_atomically
+
+
+class LessonManifest:
+    # Records every downloaded lesson by ID, so a re-run only fetches what is missing or was changed in the store
+
+    def __init__(self, folder: str, file_name: str = 'manifest.json', store=None):
+        self.folder = folder
+        self.path = os.path.join(folder, file_name)
+        self.store = store if store is not None else FileLessonStore(folder)
+        self.lock = threading.Lock()
+        self.lessons: dict[str, dict] = {}
+        os.makedirs(folder, exist_ok=True)
+        if os.path.exists(self.path):
+            with open(self.path, encoding='utf-8') as file:
+                self.lessons = json.load(file)['lessons']
+            print(f"Loaded {len(self.lessons)} lessons from {self.path}")
+
+    def is_complete(self, lesson_id: str, url: str) -> bool:
+        entry = self.lessons.get(lesson_id)
+        if entry is None or entry['url'] != url:
+            return False
+        return self.store.content_hash(lesson_id) == entry['sha256']
+
+    def save_lesson(self, lesson_id: str, url: str, position: int, page_source: str):
+        content = page_source.encode('utf-8')
+        self.store.write(lesson_id, content)
+        with self.lock:
+            self.lessons[lesson_id] = {
+                'id': lesson_id,
+                'url': url,
+                'position': position,
+                'sha256': hashlib.sha256(content).hexdigest(),
+                'size': len(content),
+                'fetched_at': datetime.now(timezone.utc).isoformat(),
+            }
+            self.save()
+
+    def save(self):
+        lessons = dict(sorted(self.lessons.items(), key=lambda item: item[1]['position']))
+        write_atomically(self.path, json.dumps({'lessons': lessons}, indent=4).encode('utf-8'))
@@ -0,0 +1,222 @@
+import hashlib
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+import threading
+import zlib
+
+import zstandard
+
+# Chunk boundaries are only considered right after these bytes, so the chunker runs over regex matches
+# instead of every byte of a multi-megabyte page source
+DELIMITER_PATTERN = re.compile(rb'[>;}\n]')
+BOUNDARY_WINDOW = 32
+# A delimiter ends a chunk when the hash of the BOUNDARY_WINDOW bytes before it has these bits clear,
+# which gives chunks of a few kilobytes on typical HTML
+BOUNDARY_MASK = 0x3F
+MIN_CHUNK_SIZE = 4 * 1024
+MAX_CHUNK_SIZE = 64 * 1024
+DIGEST_SIZE = 32
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+}
+
+
+def write_atomically(path: str, content: bytes):
+    # Readers see either the previous file or the complete new one, never a partial write
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(content)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def split_into_chunks(content: bytes) -> list[bytes]:
+    # Content-defined: a boundary depends only on the bytes just before it, so an insertion early in the
+    # page shifts the following boundaries along with the content instead of changing every chunk
+    chunks = []
+    start = 0
+    while len(content) - start > MIN_CHUNK_SIZE:
+        # Nothing before MIN_CHUNK_SIZE can end the chunk, so the search skips straight past it
+        limit = min(start + MAX_CHUNK_SIZE, len(content))
+        end = limit
+        match = DELIMITER_PATTERN.search(content, start + MIN_CHUNK_SIZE - 1, limit)
+        while match is not None:
+            if not zlib.crc32(content[match.end() - BOUNDARY_WINDOW:match.end()]) & BOUNDARY_MASK:
+                end = match.end()
+                break
+            match = DELIMITER_PATTERN.search(content, match.end(), limit)
+        if end == len(content):
+            break
+        chunks.append(content[start:end])
+        start = end
+    if start < len(content):
+        chunks.append(content[start:])
+    return chunks
+
+
+class FileLessonStore:
+    # One HTML file per lesson, as the scraper always wrote them
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        os.makedirs(folder, exist_ok=True)
+
+    def lesson_path(self, lesson_id: str) -> str:
+        return os.path.join(self.folder, f'lesson_{lesson_id}.html')
+
+    def write(self, lesson_id: str, content: bytes):
+        write_atomically(self.lesson_path(lesson_id), content)
+
+    def read(self, lesson_id: str) -> bytes:
+        with open(self.lesson_path(lesson_id), 'rb') as file:
+            return file.read()
+
+    def content_hash(self, lesson_id: str) -> str | None:
+        try:
+            return hashlib.sha256(self.read(lesson_id)).hexdigest()
+        except FileNotFoundError:
+            return None
+
+    def disk_bytes(self) -> int:
+        return sum(entry.stat().st_size for entry in os.scandir(self.folder)
+                   if entry.name.startswith('lesson_') and entry.name.endswith('.html'))
+
+
+class ChunkedLessonStore:
+    # Lessons are stored as lists of chunk digests; every distinct chunk is kept once, zstd-compressed,
+    # in a single SQLite file
+
+    def __init__(self, path: str, compression_level: int = 3):
+        self.path = path
+        self.compressor = zstandard.ZstdCompressor(level=compression_level)
+        self.lock = threading.Lock()
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        for name, value in SQLITE_PRAGMAS.items():
+            self.connection.execute(f'PRAGMA {name} = {value}')
+        with self.connection:
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS chunks (digest BLOB PRIMARY KEY, size INTEGER NOT NULL, data BLOB NOT NULL)')
+            self.connection.execute(
+                'CREATE TABLE IF NOT EXISTS lessons (lesson_id TEXT PRIMARY KEY, sha256 TEXT NOT NULL, '
+                'size INTEGER NOT NULL, chunk_digests BLOB NOT NULL)')
+
+    def _existing_digests(self, digests: list[bytes]) -> set[bytes]:
+        existing = set()
+        unique_digests = list(set(digests))
+        # Stays below SQLite's default limit of bound parameters per statement
+        for start in range(0, len(unique_digests), 500):
+            batch = unique_digests[start:start + 500]
+            rows = self.connection.execute(
+                f'SELECT digest FROM chunks WHERE digest IN ({",".join("?" * len(batch))})', batch)
+            existing.update(row[0] for row in rows)
+        return existing
+
+    def write(self, lesson_id: str, content: bytes) -> int:
+        # Returns the number of chunks that were not stored yet
+        chunks = split_into_chunks(content)
+        digests = [hashlib.sha256(chunk).digest() for chunk in chunks]
+        with self.lock, self.connection:
+            existing = self._existing_digests(digests)
+            new_chunks = {}
+            for digest, chunk in zip(digests, chunks):
+                if digest not in existing and digest not in new_chunks:
+                    new_chunks[digest] = (digest, len(chunk), self.compressor.compress(chunk))
+            self.connection.executemany('INSERT INTO chunks (digest, size, data) VALUES (?, ?, ?)',
+                                        new_chunks.values())
+            self.connection.execute(
+                'INSERT OR REPLACE INTO lessons (lesson_id, sha256, size, chunk_digests) VALUES (?, ?, ?, ?)',
+                (lesson_id, hashlib.sha256(content).hexdigest(), len(content), b''.join(digests)))
+        return len(new_chunks)
+
+    def read(self, lesson_id: str) -> bytes:
+        with self.lock:
+            row = self.connection.execute('SELECT sha256, chunk_digests FROM lessons WHERE lesson_id = ?',
+                                          (lesson_id,)).fetchone()
+            if row is None:
+                raise KeyError(lesson_id)
+            sha256, chunk_digests = row
+            digests = [chunk_digests[i:i + DIGEST_SIZE] for i in range(0, len(chunk_digests), DIGEST_SIZE)]
+            compressed_chunks = {}
+            unique_digests = list(set(digests))
+            for start in range(0, len(unique_digests), 500):
+                batch = unique_digests[start:start + 500]
+                rows = self.connection.execute(
+                    f'SELECT digest, data FROM chunks WHERE digest IN ({",".join("?" * len(batch))})', batch)
+                compressed_chunks.update(rows)
+        decompressor = zstandard.ZstdDecompressor()
+        content = b''.join(decompressor.decompress(compressed_chunks[digest]) for digest in digests)
+        if hashlib.sha256(content).hexdigest() != sha256:
+            raise ValueError(f"Lesson {lesson_id} does not match its stored hash")
+        return content
+
+    def content_hash(self, lesson_id: str) -> str | None:
+        with self.lock:
+            row = self.connection.execute('SELECT sha256 FROM lessons WHERE lesson_id = ?', (lesson_id,)).fetchone()
+        return row[0] if row else None
+
+    def lesson_ids(self) -> list[str]:
+        with self.lock:
+            return [row[0] for row in self.connection.execute('SELECT lesson_id FROM lessons ORDER BY lesson_id')]
+
+    def collect_garbage(self) -> int:
+        # Chunks only referenced by overwritten lesson versions are dropped, returns how many
+        with self.lock, self.connection:
+            referenced = set()
+            for (chunk_digests,) in self.connection.execute('SELECT chunk_digests FROM lessons'):
+                referenced.update(chunk_digests[i:i + DIGEST_SIZE] for i in range(0, len(chunk_digests), DIGEST_SIZE))
+            orphans = [(digest,) for (digest,) in self.connection.execute('SELECT digest FROM chunks')
+                       if digest not in referenced]
+            self.connection.executemany('DELETE FROM chunks WHERE digest = ?', orphans)
+        return len(orphans)
+
+    def disk_bytes(self) -> int:
+        # Folds the WAL back into the database first, it holds superseded page versions until a checkpoint
+        with self.lock:
+            self.connection.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+        return sum(os.path.getsize(path) for path in (self.path, f'{self.path}-wal') if os.path.exists(path))
+
+    def stats(self) -> dict:
+        with self.lock:
+            lesson_count, logical_bytes = self.connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0) FROM lessons').fetchone()
+            chunk_count, unique_bytes, stored_bytes = self.connection.execute(
+                'SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(LENGTH(data)), 0) FROM chunks').fetchone()
+        return {
+            'lessons': lesson_count,
+            'chunks': chunk_count,
+            'logical_bytes': logical_bytes,
+            'unique_bytes': unique_bytes,
+            'stored_bytes': stored_bytes,
+            'dedup_ratio': logical_bytes / unique_bytes if unique_bytes else 0.0,
+            'compression_ratio': logical_bytes / stored_bytes if stored_bytes else 0.0,
+        }
+
+    def close(self):
+        self.connection.close()
+
+
+if __name__ == '__main__':
+    # python lesson_store.py lessons/lessons.db                       prints the store statistics
+    # python lesson_store.py lessons/lessons.db <lesson id> out.html  reconstructs one lesson
+    store = ChunkedLessonStore(sys.argv[1])
+    try:
+        if len(sys.argv) > 2:
+            with open(sys.argv[3], 'wb') as file:
+                file.write(store.read(sys.argv[2]))
+            print(f"Lesson {sys.argv[2]} written to {sys.argv[3]}")
+        else:
+            for key, value in store.stats().items():
+                print(f"{key}: {value:.2f}" if isinstance(value, float) else f"{key}: {value}")
+    finally:
+        store.close()
@@ -1,9 +1,30 @@
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+from selenium.common import StaleElementReferenceException
 from selenium.webdriver.common.by import By
 import config
 import chrome_facade
-from chrome_facade import find_elements_with_wait, prepare_driver, navigate_to_page
+from chrome_facade import copy_session, find_elements_with_wait, prepare_driver, navigate_to_page
+from lesson_manifest import LessonManifest
+from lesson_store import ChunkedLessonStore, FileLessonStore
+from tracing import TRACER, traced
+
+ROOT_URL = 'https://app.educate-me.co/'
+LESSONS_FOLDER = 'lessons'
+# Opt-in: stores the repeated SPA shell of every lesson once in LESSON_STORE_PATH instead of writing a
+# lesson_*.html file per lesson; python lesson_store.py <db> <lesson id> <file> exports a lesson back to HTML
+DEDUPLICATE_LESSONS = False
+LESSON_STORE_PATH = f'{LESSONS_FOLDER}/lessons.db'
+WORKER_COUNT = 4
+MAX_ATTEMPTS = 3
+TRACE_FILE_PATH = 'trace.json'
+PROFILE_FILE_PATH = 'profile.folded'
+# Samples Python stacks in the background, for time spent outside of traced functions
+ENABLE_SAMPLING_PROFILER = False
 
 
+@traced
 def sign_in(driver):
     print("Signing in")
     username = driver.find_element(By.ID, "normal_login_username")
@@ -18,6 +39,7 @@ def sign_in(driver):
     print("Sign-in completed")
 
 
+@traced
 def prepare_page_to_extract(driver):
     print("Preparing the page to extract content")
     enable_video_element = find_elements_with_wait(driver, By.XPATH, "//span[text()='play_circle']")
@@ -34,34 +56,138 @@ def build_lesson_url(course_url, lesson_id):
     return lesson_url
 
 
+@traced
+def download_lesson(driver, manifest, lesson_url, lesson_id, index):
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            if attempt > 1:
+                driver.refresh()
+            navigate_to_page(driver, lesson_url)
+            prepare_page_to_extract(driver)
+            page_source = driver.page_source
+            break
+        except StaleElementReferenceException:
+            if attempt == MAX_ATTEMPTS:
+                raise
+            print(f"Lesson {index} went stale, retrying (attempt {attempt + 1} of {MAX_ATTEMPTS})")
+    manifest.save_lesson(lesson_id, lesson_url, index, page_source)
+    print(f"Saved lesson {index} ({lesson_id}) to file")
+
+
+def download_lessons_worker(driver, manifest, lessons, failed_lessons):
+    # Each worker owns one driver and takes the next lesson as soon as it is done with the previous one
+    while True:
+        try:
+            index, lesson_id, lesson_url = lessons.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            download_lesson(driver, manifest, lesson_url, lesson_id, index)
+        except Exception as e:
+            print(f"Failed to download lesson {index} ({lesson_id}): {e}")
+            failed_lessons.append(index)
+
+
+@traced
+def prepare_signed_in_drivers(signed_in_driver, count):
+    if count == 0:
+        return []
+    drivers = []
+    try:
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            # Every driver that did start is collected, even when another one failed, so it can be quit below
+            futures = [executor.submit(prepare_driver) for _ in range(count)]
+            errors = []
+            for future in futures:
+                try:
+                    drivers.append(future.result())
+                except Exception as e:
+                    errors.append(e)
+            if errors:
+                raise errors[0]
+            list(executor.map(lambda driver: copy_session(signed_in_driver, driver, ROOT_URL), drivers))
+    except BaseException:
+        for driver in drivers:
+            driver.quit()
+        raise
+    return drivers
+
+
+@traced
+def open_course(driver):
+    navigate_to_page(driver, ROOT_URL)
+    if "signIn" in driver.current_url:
+        sign_in(driver)
+    available_courses = find_elements_with_wait(driver, By.XPATH, f"//a[contains(@href, 'experiences/')]")
+    print(f"Found {len(available_courses)} available courses")
+    course_to_download_urls = [c.get_attribute('href') for c in available_courses if config.COURSE_TO_DOWNLOAD in c.get_attribute('text')]
+    if not course_to_download_urls:
+        raise ValueError(f"Course {config.COURSE_TO_DOWNLOAD} not found")
+    course_to_download_url = course_to_download_urls[0]
+    print(f"Course to download URL: {course_to_download_url}")
+    navigate_to_page(driver, course_to_download_url)
+    lessons = find_elements_with_wait(driver, By.XPATH, "//div[@id='timeLineContainer']//div[@id != ''][not(.//*[contains(text(), 'Assignment')])]")
+    lesson_ids = [l.get_attribute('id') for l in lessons]
+    print(f"Found {len(lesson_ids)} lesson IDs")
+    return course_to_download_url, lesson_ids
+
+
+@traced
+def find_pending_lessons(manifest, course_url, lesson_ids):
+    # Lessons already in the manifest with an intact file are skipped, the rest keep their course order
+    pending_lessons = []
+    for index, lesson_id in enumerate(lesson_ids):
+        lesson_url = build_lesson_url(course_url, lesson_id)
+        if not manifest.is_complete(lesson_id, lesson_url):
+            pending_lessons.append((index, lesson_id, lesson_url))
+    print(f"Skipping {len(lesson_ids) - len(pending_lessons)} complete lessons, {len(pending_lessons)} to download")
+    return pending_lessons
+
+
+@traced
+def download_lessons(drivers, manifest, pending_lessons):
+    lessons = queue.Queue()
+    for lesson in pending_lessons:
+        lessons.put(lesson)
+    failed_lessons = []
+    with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+        for driver in drivers:
+            executor.submit(download_lessons_worker, driver, manifest, lessons, failed_lessons)
+    return sorted(failed_lessons)
+
+
 if __name__ == '__main__':
     print("Starting script execution")
     if not config.LOGIN or not config.PASSWORD or not config.COURSE_TO_DOWNLOAD:
         raise ValueError("Please provide LOGIN, PASSWORD and COURSE_TO_DOWNLOAD in config.py")
+    if ENABLE_SAMPLING_PROFILER:
+        TRACER.start_profiler()
+    store = ChunkedLessonStore(LESSON_STORE_PATH) if DEDUPLICATE_LESSONS else FileLessonStore(LESSONS_FOLDER)
     driver = prepare_driver()
+    drivers = [driver]
     try:
-        navigate_to_page(driver, 'https://app.educate-me.co/')
-        if "signIn" in driver.current_url:
-            sign_in(driver)
-        available_courses = find_elements_with_wait(driver, By.XPATH, f"//a[contains(@href, 'experiences/')]")
-        print(f"Found {len(available_courses)} available courses")
-        course_to_download_urls = [c.get_attribute('href') for c in available_courses if config.COURSE_TO_DOWNLOAD in c.get_attribute('text')]
-        if not course_to_download_urls:
-            raise ValueError(f"Course {config.COURSE_TO_DOWNLOAD} not found")
-        course_to_download_url = course_to_download_urls[0]
-        print(f"Course to download URL: {course_to_download_url}")
-        navigate_to_page(driver, course_to_download_url)
-        lessons = find_elements_with_wait(driver, By.XPATH, "//div[@id='timeLineContainer']//div[@id != ''][not(.//*[contains(text(), 'Assignment')])]")
-        lesson_ids = [l.get_attribute('id') for l in lessons]
-        print(f"Found {len(lesson_ids)} lesson IDs")
-        for i in range(len(lesson_ids)):
-            lesson_id = lesson_ids[i]
-            lesson_url = build_lesson_url(course_to_download_url, lesson_id)
-            navigate_to_page(driver, lesson_url)
-            prepare_page_to_extract(driver)
-            with open(f'lessons/lesson_{i}.html', 'w') as file:
-                file.write(driver.page_source)
-            print(f"Saved lesson {i} to file")
+        course_to_download_url, lesson_ids = open_course(driver)
+        manifest = LessonManifest(LESSONS_FOLDER, store=store)
+        pending_lessons = find_pending_lessons(manifest, course_to_download_url, lesson_ids)
+        worker_count = max(1, min(WORKER_COUNT, len(pending_lessons)))
+        drivers += prepare_signed_in_drivers(driver, worker_count - 1)
+        failed_lessons = download_lessons(drivers, manifest, pending_lessons)
+        if failed_lessons:
+            print(f"Failed to download lessons: {failed_lessons}")
+        if DEDUPLICATE_LESSONS:
+            stats = store.stats()
+            print(f"Stored {stats['lessons']} lessons, {stats['logical_bytes']} bytes as {stats['stored_bytes']} bytes "
+                  f"(dedup ratio {stats['dedup_ratio']:.1f}x, {stats['compression_ratio']:.1f}x overall)")
     finally:
-        driver.quit()
+        for d in drivers:
+            d.quit()
         print("Driver quit")
+        if DEDUPLICATE_LESSONS:
+            store.close()
+        TRACER.stop_profiler()
+        TRACER.print_summary()
+        TRACER.export_trace(TRACE_FILE_PATH)
+        print(f"Trace written to {TRACE_FILE_PATH}")
+        if TRACER.profiler is not None:
+            TRACER.profiler.export_collapsed(PROFILE_FILE_PATH)
+            print(f"Sampled stacks written to {PROFILE_FILE_PATH}")
@@ -0,0 +1,155 @@
+# Same module as hw-lec-8-selenium/tracing.py, which is the reference copy: change both files together
+import functools
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+
+class Span:
+
+    def __init__(self, name: str, depth: int, thread_id: int, start: float):
+        self.name = name
+        self.depth = depth
+        self.thread_id = thread_id
+        self.start = start
+        self.duration = 0.0
+
+
+class SamplingProfiler:
+    # Samples the Python stacks of all threads at a fixed interval, for code paths that have no spans
+
+    def __init__(self, interval: float = 0.005):
+        self.interval = interval
+        self.samples: Counter[str] = Counter()
+        self._stop_event = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name='sampling-profiler', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own_thread_id = threading.get_ident()
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_thread_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    stack.append(f'{frame.f_code.co_name} ({os.path.basename(frame.f_code.co_filename)})')
+                    frame = frame.f_back
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def export_collapsed(self, file_path: str) -> None:
+        # Brendan Gregg's collapsed stack format, readable by flamegraph.pl and speedscope
+        with open(file_path, 'w', encoding='utf-8') as file:
+            for stack, count in self.samples.most_common():
+                file.write(f'{stack} {count}\n')
+
+
+class Tracer:
+
+    def __init__(self, verbose: bool = True):
+        self.verbose = verbose
+        self.spans: list[Span] = []
+        self.durations: dict[str, list[float]] = defaultdict(list)
+        self.profiler: SamplingProfiler | None = None
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self) -> list[Span]:
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    @contextmanager
+    def span(self, name: str):
+        stack = self._stack()
+        span = Span(name, len(stack), threading.get_ident(), time.perf_counter())
+        stack.append(span)
+        try:
+            yield span
+        finally:
+            span.duration = time.perf_counter() - span.start
+            stack.pop()
+            with self._lock:
+                self.spans.append(span)
+                self.durations[name].append(span.duration)
+            if self.verbose:
+                print(f"{'  ' * span.depth}Function {name} executed in {span.duration:.4f} seconds")
+
+    def traced(self, func=None, *, name: str | None = None):
+        def decorator(func):
+            span_name = name or func.__name__
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(span_name):
+                    return func(*args, **kwargs)
+
+            return wrapper
+
+        return decorator(func) if func is not None else decorator
+
+    def start_profiler(self, interval: float = 0.005) -> SamplingProfiler:
+        self.profiler = SamplingProfiler(interval)
+        self.profiler.start()
+        return self.profiler
+
+    def stop_profiler(self) -> None:
+        if self.profiler is not None:
+            self.profiler.stop()
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            durations = {name: sorted(values) for name, values in self.durations.items()}
+        return {
+            name: {
+                'count': len(values),
+                'total': sum(values),
+                'p50': statistics.median(values),
+                'p95': values[min(len(values) - 1, int(round(0.95 * (len(values) - 1))))],
+                'max': values[-1],
+            }
+            for name, values in durations.items()
+        }
+
+    def print_summary(self) -> None:
+        print(f"{'function':<36} {'count':>6} {'total':>9} {'p50':>9} {'p95':>9} {'max':>9}")
+        for name, aggregate in sorted(self.summary().items(), key=lambda entry: -entry[1]['total']):
+            print(f"{name:<36} {aggregate['count']:>6} {aggregate['total']:>8.3f}s {aggregate['p50']:>8.3f}s "
+                  f"{aggregate['p95']:>8.3f}s {aggregate['max']:>8.3f}s")
+
+    def export_trace(self, file_path: str) -> None:
+        # Chrome trace event format: opens in chrome://tracing, Perfetto and speedscope as a flame chart
+        with self._lock:
+            events = [
+                {
+                    'name': span.name,
+                    'ph': 'X',
+                    'ts': round((span.start - self._origin) * 1_000_000, 3),
+                    'dur': round(span.duration * 1_000_000, 3),
+                    'pid': os.getpid(),
+                    'tid': span.thread_id,
+                }
+                for span in self.spans
+            ]
+        with open(file_path, 'w', encoding='utf-8') as file:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, file)
+
+
+TRACER = Tracer()
+traced = TRACER.traced
+span = TRACER.span
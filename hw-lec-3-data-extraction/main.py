@@ -1,9 +1,13 @@
+import hashlib
 import re
+from collections import OrderedDict
+
 import lxml.etree as etree
 
+from pattern_extractor import DEFAULT_CHUNK_SIZE, MultiPatternExtractor
 
-def extract_dates(doc: str):
-    date_pattern = r"""
+
+DATE_PATTERN = re.compile(r"""
     \b(                     # Start of word boundary
     (?:                     # Non-capturing group for different date formats
         \d{2}[/-]\d{2}[/-]\d{4}     # Matches MM/DD/YYYY or MM-DD-YYYY
@@ -11,32 +15,117 @@ def extract_dates(doc: str):
       | \b(?:Jan(?:uary)?|Feb(?:ruary)?|Mar(?:ch)?|Apr(?:il)?|May|Jun(?:e)?|Jul(?:y)?|Aug(?:ust)?|Sep(?:tember)?|Oct(?:ober)?|Nov(?:ember)?|Dec(?:ember)?)\s\d{1,2},\s\d{4}\b
     )                       # End of non-capturing group
     \b)                     # End of word boundary
-    """
-    return re.findall(date_pattern, doc, re.VERBOSE)
+    """, re.VERBOSE)
+DATE_MAX_LENGTH = len('September 30, 2024')
 
-
-def extract_emails(doc: str):
-    email_pattern = r'''
+EMAIL_PATTERN = re.compile(r'''
     [a-zA-Z0-9._%+-]+       # Username part: Alphanumeric characters and special characters
     @                       # At symbol
     [a-zA-Z0-9.-]+          # Domain name part: Alphanumeric characters, dot and hyphen
     \.[a-zA-Z]{2,}          # Top level domain: Dot followed by 2 or more letters
-    '''
-    return re.findall(email_pattern, doc, re.VERBOSE)
+    ''', re.VERBOSE)
+EMAIL_MAX_LENGTH = 254
+
+
+def extract_dates(doc: str):
+    return DATE_PATTERN.findall(doc)
+
+
+def extract_emails(doc: str):
+    return EMAIL_PATTERN.findall(doc)
+
+
+def create_text_extractor(chunk_size: int = DEFAULT_CHUNK_SIZE) -> MultiPatternExtractor:
+    extractor = MultiPatternExtractor(chunk_size=chunk_size)
+    extractor.register('date', DATE_PATTERN, group=1, max_length=DATE_MAX_LENGTH)
+    extractor.register('email', EMAIL_PATTERN, max_length=EMAIL_MAX_LENGTH)
+    return extractor
+
+
+PARSED_TREE_CACHE_SIZE = 32
+
+
+class ParsedTreeCache:
+
+    def __init__(self, max_size: int = PARSED_TREE_CACHE_SIZE):
+        self.max_size = max_size
+        self._trees: OrderedDict[str, etree._Element] = OrderedDict()
+
+    def get_tree(self, html: str) -> etree._Element:
+        key = hashlib.sha256(html.encode('utf-8')).hexdigest()
+        tree = self._trees.get(key)
+        if tree is not None:
+            self._trees.move_to_end(key)
+            return tree
+        tree = etree.HTML(html)
+        self._trees[key] = tree
+        if len(self._trees) > self.max_size:
+            self._trees.popitem(last=False)
+        return tree
+
+    def clear(self) -> None:
+        self._trees.clear()
+
+
+class XPathRegistry:
+
+    def __init__(self):
+        self._compiled: dict[str, etree.XPath] = {}
+        self._named: dict[str, etree.XPath] = {}
+
+    def compile(self, xpath: str) -> etree.XPath:
+        compiled = self._compiled.get(xpath)
+        if compiled is None:
+            compiled = etree.XPath(xpath)
+            self._compiled[xpath] = compiled
+        return compiled
+
+    def register(self, name: str, xpath: str) -> None:
+        self._named[name] = self.compile(xpath)
+
+    def evaluate(self, tree: etree._Element, names: list[str] | None = None) -> dict[str, list]:
+        names = list(self._named) if names is None else names
+        return {name: self._named[name](tree) for name in names}
+
+
+PARSED_TREE_CACHE = ParsedTreeCache()
+XPATH_REGISTRY = XPathRegistry()
+
+
+class HtmlDocument:
+
+    def __init__(self, html: str, tree_cache: ParsedTreeCache = PARSED_TREE_CACHE,
+                 registry: XPathRegistry = XPATH_REGISTRY):
+        self.tree = tree_cache.get_tree(html)
+        self.registry = registry
+
+    def find(self, xpath: str) -> list:
+        return self.registry.compile(xpath)(self.tree)
+
+    def find_single(self, xpath: str):
+        return single_element(self.find(xpath), xpath)
+
+    def find_all(self, queries: dict[str, str]) -> dict[str, list]:
+        return {name: self.find(xpath) for name, xpath in queries.items()}
+
+    def find_registered(self, names: list[str] | None = None) -> dict[str, list]:
+        return self.registry.evaluate(self.tree, names)
 
 
 def find_by_html_xpath(html: str, xpath: str) -> list:
-    tree = etree.HTML(html)
-    return tree.xpath(xpath)
+    return HtmlDocument(html).find(xpath)
 
 
-def find_single_element_by_html_xpath(html: str, xpath: str):
-    elements = find_by_html_xpath(html, xpath)
+def single_element(elements: list, xpath: str):
     if len(elements) != 1:
         raise ValueError(f"Expected exactly one element for XPath '{xpath}', but found {len(elements)}")
     return elements[0]
 
 
+def find_single_element_by_html_xpath(html: str, xpath: str):
+    return single_element(find_by_html_xpath(html, xpath), xpath)
+
+
 def read_file(file_path: str) -> str:
     with open(file_path, 'r', encoding='utf-8') as file:
         return file.read()
@@ -62,6 +151,15 @@ def test_find_by_html_xpath() -> None:
     search_element = find_single_element_by_html_xpath(html, "//button[@type='submit' and text()='Achar vagas']")
     validate_search_form_elements(title_element, region_element, search_element)
 
+    # Option 1 in a single batch against one parsed tree
+    queries = {
+        'title': "//input[@id='text-input-what']",
+        'region': "//input[@id='text-input-where']",
+        'search': "//button[@type='submit' and text()='Achar vagas']",
+    }
+    elements = HtmlDocument(html).find_all(queries)
+    validate_search_form_elements(*(single_element(elements[name], queries[name]) for name in queries))
+
     # Option 2: Using common element
     form_xpath = "//form[@id='jobsearch']"
     inputs = find_by_html_xpath(html, f"{form_xpath}//input|{form_xpath}//button")
@@ -78,6 +176,12 @@ def test_extract_with_regex():
     validate_equal(len(dates), 8)
     validate_equal(len(emails), 8)
 
+    # Tiny chunks force matches to straddle chunk boundaries
+    matches = list(create_text_extractor(chunk_size=7).extract_file('regex-doc.txt'))
+    validate_equal([m.value for m in matches if m.name == 'date'], dates)
+    validate_equal([m.value for m in matches if m.name == 'email'], emails)
+    validate_equal([doc[m.start:m.end] for m in matches if m.name == 'email'], emails)
+
 
 if __name__ == '__main__':
     test_find_by_html_xpath()
@@ -0,0 +1,85 @@
+import re
+from typing import Iterable, Iterator, NamedTuple
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_MAX_MATCH_LENGTH = 256
+
+
+class ExtractionPattern(NamedTuple):
+    name: str
+    regex: re.Pattern
+    group: int = 0
+    max_length: int = DEFAULT_MAX_MATCH_LENGTH
+
+
+class PatternMatch(NamedTuple):
+    name: str
+    value: str
+    start: int
+    end: int
+
+
+class MultiPatternExtractor:
+
+    def __init__(self, patterns: Iterable[ExtractionPattern] = (), chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.patterns: list[ExtractionPattern] = list(patterns)
+        self.chunk_size = chunk_size
+
+    def register(self, name: str, pattern: str | re.Pattern, flags: int = 0, group: int = 0,
+                 max_length: int = DEFAULT_MAX_MATCH_LENGTH) -> None:
+        regex = pattern if isinstance(pattern, re.Pattern) else re.compile(pattern, flags)
+        self.patterns.append(ExtractionPattern(name, regex, group, max_length))
+
+    @property
+    def overlap(self) -> int:
+        # A match is only final once it starts this far from the end of the buffered text
+        return max((pattern.max_length for pattern in self.patterns), default=0) + 1
+
+    def extract(self, text: str) -> list[PatternMatch]:
+        return list(self.iterate_chunks([text]))
+
+    def extract_file(self, file_path: str) -> Iterator[PatternMatch]:
+        with open(file_path, 'r', encoding='utf-8') as file:
+            yield from self.iterate_chunks(iter(lambda: file.read(self.chunk_size), ''))
+
+    def iterate_chunks(self, chunks: Iterable[str]) -> Iterator[PatternMatch]:
+        # Every pattern runs over each buffered chunk in turn, so the input is read once. Results per
+        # pattern are identical to pattern.findall over the whole text as long as no match is longer
+        # than the pattern's max_length. The buffer keeps `overlap` characters of left context for \b
+        # and lookbehinds, plus the tail whose matches might still change once more text arrives.
+        overlap = self.overlap
+        buffer = ''
+        buffer_offset = 0
+        resume_positions = [0] * len(self.patterns)
+        chunks = iter(chunks)
+        chunk = next(chunks, None)
+        while chunk is not None:
+            buffer += chunk
+            chunk = next(chunks, None)
+            at_eof = chunk is None
+            cutoff = len(buffer) if at_eof else len(buffer) - overlap
+            if cutoff <= 0:
+                continue
+
+            matches: list[tuple[int, int, PatternMatch]] = []
+            for index, pattern in enumerate(self.patterns):
+                pos = max(resume_positions[index] - buffer_offset, 0)
+                for match in pattern.regex.finditer(buffer, pos):
+                    if match.start() >= cutoff:
+                        break
+                    matches.append((match.start(), index, PatternMatch(
+                        pattern.name,
+                        match.group(pattern.group),
+                        buffer_offset + match.start(),
+                        buffer_offset + match.end(),
+                    )))
+                    pos = match.end()
+                resume_positions[index] = buffer_offset + max(pos, cutoff)
+
+            matches.sort(key=lambda entry: (entry[0], entry[1]))
+            for _, _, pattern_match in matches:
+                yield pattern_match
+
+            keep_from = max(cutoff - overlap, 0)
+            buffer = buffer[keep_from:]
+            buffer_offset += keep_from
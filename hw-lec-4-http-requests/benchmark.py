@@ -0,0 +1,35 @@
+import time
+
+from main import iterate_job_title_pages, iterate_job_title_pages_serially, load_json_file
+from stub_server import start_stub_server
+
+PAGE_COUNT = 50
+LATENCY = 0.05
+WINDOWS = [1, 4, 8, 16]
+
+
+def measure(label: str, pages) -> None:
+    start_time = time.perf_counter()
+    page_count = 0
+    job_count = 0
+    for page, job_titles in pages:
+        if page != page_count:
+            raise AssertionError(f"Expected page {page_count}, but got {page}")
+        page_count += 1
+        job_count += len(job_titles)
+    execution_time = time.perf_counter() - start_time
+    print(f"{label:<16} {page_count} pages, {job_count} jobs in {execution_time:.3f} seconds "
+          f"({page_count / execution_time:.1f} pages/sec)")
+
+
+if __name__ == '__main__':
+    headers = load_json_file('headers.json')
+    data_template = load_json_file('data_template.json')
+    server, url = start_stub_server(page_count=PAGE_COUNT, latency=LATENCY)
+    try:
+        measure('serial', iterate_job_title_pages_serially(headers, data_template, url=url))
+        for window in WINDOWS:
+            measure(f'window={window}',
+                    iterate_job_title_pages(headers, data_template, window=window, url=url))
+    finally:
+        server.shutdown()
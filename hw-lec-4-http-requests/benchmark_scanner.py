@@ -0,0 +1,30 @@
+import time
+
+from main import JOB_TITLE_CLOSING, JOB_TITLE_OPENING, find_encoded_job_titles_with_regex, scan_encoded_job_titles
+from stub_server import render_page
+
+SIZES = [500, 1000, 2000, 4000]
+
+
+def build_worst_case_response(opening_count: int) -> str:
+    # Openers whose closing tag only appears on a later line make the lazy regex scan to that line break each time
+    return JOB_TITLE_OPENING * opening_count + '\n' + JOB_TITLE_CLOSING
+
+
+def measure(find_encoded_job_titles, response: str) -> float:
+    start_time = time.perf_counter()
+    find_encoded_job_titles(response)
+    return time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    response = render_page(0, 1, 500)
+    if scan_encoded_job_titles(response) != find_encoded_job_titles_with_regex(response):
+        raise AssertionError("Scanner and regex results differ on a generated page")
+
+    print(f"{'openers':>8} {'regex':>10} {'scanner':>10}")
+    for size in SIZES:
+        response = build_worst_case_response(size)
+        regex_time = measure(find_encoded_job_titles_with_regex, response)
+        scanner_time = measure(scan_encoded_job_titles, response)
+        print(f"{size:>8} {regex_time:>9.4f}s {scanner_time:>9.4f}s")
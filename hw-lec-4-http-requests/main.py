@@ -1,10 +1,21 @@
-import hashlib
+import copy
 import json
 import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Iterator
+
 import requests
+from requests.adapters import HTTPAdapter
+
+from response_cache import ResponseCache, build_cache_key
 
 JOB_TITLE_REGEX = re.compile(r'<h3 class=\\"jobCard_title\\">(.*?)<\\/h3>')
+JOB_TITLE_OPENING = r'<h3 class=\"jobCard_title\">'
+JOB_TITLE_CLOSING = r'<\/h3>'
 BASE_URL = 'https://www.lejobadequat.com/emplois'
+CACHE_DIR = 'cache'
+CACHE_TTL_SECONDS = 7 * 24 * 60 * 60
+CACHE_MAX_BYTES = 512 * 1024 * 1024
 
 
 def load_json_file(file_path: str) -> dict:
@@ -12,48 +23,131 @@ def load_json_file(file_path: str) -> dict:
         return json.load(file)
 
 
-def make_request(paged_value: int, headers: dict, data_template: dict) -> str:
-    data_template["data"]["load_more"] = [paged_value]
-    data_template["data"]["paged"] = paged_value
-    return post_content(BASE_URL, headers, data_template, paged_value)
+def build_page_payload(data_template: dict, paged_value: int) -> dict:
+    payload = copy.deepcopy(data_template)
+    payload["data"]["load_more"] = [paged_value]
+    payload["data"]["paged"] = paged_value
+    return payload
+
+
+def make_request(paged_value: int, headers: dict, data_template: dict,
+                 session: requests.Session | None = None, url: str = BASE_URL,
+                 cache: ResponseCache | None = None) -> str:
+    payload = build_page_payload(data_template, paged_value)
+    return post_content(url, headers, payload, session, cache)
+
+
+def post_content(url: str, headers: dict, json: dict,
+                 session: requests.Session | None = None, cache: ResponseCache | None = None) -> str:
+    http = session or requests
+    if cache is None:
+        return http.post(url, headers=headers, json=json).text
 
+    cache_key = build_cache_key('POST', url, json)
+    content = cache.get(cache_key)
+    if content is not None:
+        print('Retrieved from cache')
+        return content
 
-def post_content(url: str, headers: dict, json: dict, id: int) -> str:
-    cache_key = f"{url}{id}"
-    filename = hashlib.md5(cache_key.encode('utf-8')).hexdigest()
-    filename = f'cache/{filename}'
+    response = http.post(url, headers=headers, json=json)
+    response.raise_for_status()
+    cache.put(cache_key, response.text)
+    print('Retrieved from server')
+    return response.text
 
-    try:
-        with open(filename, 'r') as file:
-            content = file.read()
-            print('Retrieved from cache')
-            return content
-    except FileNotFoundError:
-        response = requests.post(url, headers=headers, json=json)
-        with open(filename, 'w') as file:
-            file.write(response.text)
-        print('Retrieved from server')
-        return response.text
 
+def find_encoded_job_titles_with_regex(response: str) -> list[str]:
+    return JOB_TITLE_REGEX.findall(response)
 
-def extract_job_titles(response: str) -> list[str]:
-    encoded_job_titles = JOB_TITLE_REGEX.findall(response)
+
+def scan_encoded_job_titles(response: str) -> list[str]:
+    # Same results as JOB_TITLE_REGEX.findall in one forward pass: the next closing tag and line break
+    # are remembered, so openers without a closing tag on the same line don't rescan the rest of the text
+    encoded_job_titles = []
+    pos = 0
+    closing_pos = -1
+    newline_pos = -1
+    while (start := response.find(JOB_TITLE_OPENING, pos)) != -1:
+        title_start = start + len(JOB_TITLE_OPENING)
+        if closing_pos < title_start:
+            closing_pos = response.find(JOB_TITLE_CLOSING, title_start)
+            if closing_pos == -1:
+                break
+        if newline_pos < title_start:
+            newline_pos = response.find('\n', title_start)
+            if newline_pos == -1:
+                newline_pos = len(response)
+        if newline_pos < closing_pos:
+            pos = newline_pos + 1
+            continue
+        encoded_job_titles.append(response[title_start:closing_pos])
+        pos = closing_pos + len(JOB_TITLE_CLOSING)
+    return encoded_job_titles
+
+
+def extract_job_titles(response: str,
+                       find_encoded_job_titles: Callable[[str], list[str]] = scan_encoded_job_titles) -> list[str]:
+    encoded_job_titles = find_encoded_job_titles(response)
     return [
         title.encode('utf-8').decode('unicode-escape').replace('&#8211;', '–').replace('H\/F', 'H/F')
         for title in encoded_job_titles
     ]
 
 
+def create_pooled_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def iterate_job_title_pages(headers: dict, data_template: dict, window: int = 8,
+                            url: str = BASE_URL,
+                            cache: ResponseCache | None = None) -> Iterator[tuple[int, list[str]]]:
+    # Keeps up to `window` pages in flight and yields them in page order.
+    # Pages after the first empty one are speculative and get discarded.
+    if window < 1:
+        raise ValueError(f"Window must be at least 1, but got {window}")
+
+    def fetch_page(page: int) -> list[str]:
+        return extract_job_titles(make_request(page, headers, data_template, session, url, cache))
+
+    with create_pooled_session(window) as session, ThreadPoolExecutor(max_workers=window) as executor:
+        in_flight = {page: executor.submit(fetch_page, page) for page in range(window)}
+        next_page = window
+        page = 0
+        try:
+            while True:
+                job_titles = in_flight.pop(page).result()
+                if not job_titles:
+                    return
+                yield page, job_titles
+                in_flight[next_page] = executor.submit(fetch_page, next_page)
+                next_page += 1
+                page += 1
+        finally:
+            for future in in_flight.values():
+                future.cancel()
+
+
+def iterate_job_title_pages_serially(headers: dict, data_template: dict, url: str = BASE_URL,
+                                     cache: ResponseCache | None = None) -> Iterator[tuple[int, list[str]]]:
+    page = 0
+    job_titles = extract_job_titles(make_request(page, headers, data_template, url=url, cache=cache))
+    while job_titles:
+        yield page, job_titles
+        page += 1
+        job_titles = extract_job_titles(make_request(page, headers, data_template, url=url, cache=cache))
+
+
 if __name__ == '__main__':
     headers = load_json_file('headers.json')
     data_template = load_json_file('data_template.json')
+    cache = ResponseCache(CACHE_DIR, ttl_seconds=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES)
 
-    page = 0
-    job_titles = extract_job_titles(make_request(page, headers, data_template))
-
-    while job_titles:
+    for page, job_titles in iterate_job_title_pages(headers, data_template, cache=cache):
         print(f'### Printing page {page}')
         for job_title in job_titles:
             print(job_title)
-        page += 1
-        job_titles = extract_job_titles(make_request(page, headers, data_template))
+    print(f'Cache stats: {cache.stats()}')
@@ -0,0 +1,146 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import zstandard
+
+CACHE_ENTRY_SUFFIX = '.zst'
+
+
+def build_cache_key(method: str, url: str, body: dict | None = None) -> str:
+    canonical_body = json.dumps(body, sort_keys=True, separators=(',', ':'), ensure_ascii=False) if body else ''
+    key_material = '\n'.join([method.upper(), url, canonical_body])
+    return hashlib.sha256(key_material.encode('utf-8')).hexdigest()
+
+
+class ResponseCache:
+
+    def __init__(self, root: str | Path, ttl_seconds: float | None = None, max_bytes: int | None = None,
+                 compression_level: int = 3):
+        self.root = Path(root)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.compression_level = compression_level
+        self.hits = 0
+        self.misses = 0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.evictions = 0
+        self._total_bytes: int | None = None
+        self._lock = threading.Lock()
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / key[2:4] / f'{key}{CACHE_ENTRY_SUFFIX}'
+
+    def get(self, key: str) -> str | None:
+        path = self.path_for(key)
+        try:
+            stat = path.stat()
+            if self.ttl_seconds is not None and time.time() - stat.st_mtime > self.ttl_seconds:
+                self._remove(path, stat.st_size)
+                self._count_miss()
+                return None
+            compressed = path.read_bytes()
+            content = zstandard.ZstdDecompressor().decompress(compressed).decode('utf-8')
+        except FileNotFoundError:
+            self._count_miss()
+            return None
+        except (zstandard.ZstdError, UnicodeDecodeError):
+            print(f'Dropping corrupted cache entry {path.as_posix()}')
+            self._remove(path, len(compressed))
+            self._count_miss()
+            return None
+
+        # atime tracks recency for LRU eviction, mtime keeps the fetch time for TTL
+        os.utime(path, (time.time(), stat.st_mtime))
+        with self._lock:
+            self.hits += 1
+            self.bytes_read += len(compressed)
+        return content
+
+    def put(self, key: str, content: str) -> None:
+        path = self.path_for(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        compressed = zstandard.ZstdCompressor(level=self.compression_level).compress(content.encode('utf-8'))
+
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'wb') as file:
+                file.write(compressed)
+                file.flush()
+                os.fsync(file.fileno())
+            try:
+                replaced_size = path.stat().st_size
+            except FileNotFoundError:
+                replaced_size = 0
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+        with self._lock:
+            self.bytes_written += len(compressed)
+            if self._total_bytes is not None:
+                self._total_bytes += len(compressed) - replaced_size
+        self._evict_if_needed()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'bytes_read': self.bytes_read,
+                'bytes_written': self.bytes_written,
+                'evictions': self.evictions,
+                'total_bytes': self.total_bytes(),
+            }
+
+    def total_bytes(self) -> int:
+        if self._total_bytes is None:
+            self._total_bytes = sum(entry.stat().st_size for entry in self._iter_entry_paths())
+        return self._total_bytes
+
+    def _iter_entry_paths(self):
+        if not self.root.exists():
+            return
+        for path in self.root.glob(f'*/*/*{CACHE_ENTRY_SUFFIX}'):
+            yield path
+
+    def _evict_if_needed(self) -> None:
+        if self.max_bytes is None:
+            return
+        with self._lock:
+            if self.total_bytes() <= self.max_bytes:
+                return
+            # Evict down to a low watermark so that a full cache does not rescan on every put
+            target_bytes = int(self.max_bytes * 0.9)
+            entries = []
+            for path in self._iter_entry_paths():
+                try:
+                    stat = path.stat()
+                except FileNotFoundError:
+                    continue
+                entries.append((stat.st_atime, stat.st_size, path))
+            entries.sort(key=lambda entry: entry[0])
+            total_bytes = sum(size for _, size, _ in entries)
+            for _, size, path in entries:
+                if total_bytes <= target_bytes:
+                    break
+                path.unlink(missing_ok=True)
+                total_bytes -= size
+                self.evictions += 1
+            self._total_bytes = total_bytes
+
+    def _remove(self, path: Path, size: int) -> None:
+        path.unlink(missing_ok=True)
+        with self._lock:
+            if self._total_bytes is not None:
+                self._total_bytes -= size
+
+    def _count_miss(self) -> None:
+        with self._lock:
+            self.misses += 1
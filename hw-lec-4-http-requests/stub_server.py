@@ -0,0 +1,60 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PORT = 8765
+
+JOB_CARD_TEMPLATE = ('<article id="post-{job_id}" class="jobCard">'
+                     '<a href="https://www.lejobadequat.com/emplois/{job_id}-offre" class="jobCard_link">'
+                     '<h3 class="jobCard_title">Offre {job_id} &#8211; Agent H/F</h3>'
+                     '</a></article>')
+
+
+def render_page(page: int, page_count: int, jobs_per_page: int) -> str:
+    cards = []
+    if page < page_count:
+        first_job_id = page * jobs_per_page
+        cards = [JOB_CARD_TEMPLATE.format(job_id=job_id) for job_id in range(first_job_id, first_job_id + jobs_per_page)]
+    # The real endpoint is PHP-backed and escapes forward slashes in JSON strings
+    return json.dumps({'template': ''.join(cards)}).replace('/', '\\/')
+
+
+def create_stub_server(page_count: int = 50, jobs_per_page: int = 12, latency: float = 0.05,
+                       port: int = 0) -> ThreadingHTTPServer:
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            length = int(self.headers.get('Content-Length', 0))
+            payload = json.loads(self.rfile.read(length) or b'{}')
+            page = int(payload.get('data', {}).get('paged', 0))
+            time.sleep(latency)
+            body = render_page(page, page_count, jobs_per_page).encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    return server
+
+
+def start_stub_server(**kwargs) -> tuple[ThreadingHTTPServer, str]:
+    server = create_stub_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f'http://{host}:{port}/emplois'
+
+
+if __name__ == '__main__':
+    server = create_stub_server(port=PORT)
+    host, port = server.server_address
+    print(f'Serving stub lejobadequat endpoint on http://{host}:{port}/emplois')
+    server.serve_forever()
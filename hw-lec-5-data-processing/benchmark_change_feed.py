@@ -0,0 +1,80 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from main import (CHANGE_ADDED, CHANGE_MODIFIED, CHANGE_REMOVED, JobRecord, batched, iterate_change_feed,
+                  write_job_records_change_feed, write_job_records_json_lines)
+
+RECORD_COUNT = 200_000
+BATCH_SIZE = 1000
+# Every posting shows up on this many cached pages
+COPIES = 2
+CHURN_EVERY = 100
+
+
+def build_job_records(job_ids: range, title_suffix: str = '') -> list[JobRecord]:
+    return [
+        JobRecord(str(job_id), f'Agent de production {job_id % 97} H/F{title_suffix}',
+                  f'https://www.lejobadequat.com/emplois/{job_id}-agent-de-production')
+        for job_id in job_ids
+    ]
+
+
+def with_duplicates(job_records: list[JobRecord]) -> list[JobRecord]:
+    return [job_record for job_record in job_records for _ in range(COPIES)]
+
+
+def expected_changes(previous: list[JobRecord], current: list[JobRecord]) -> dict[str, set[str]]:
+    # Plain set arithmetic over both full runs, what the index has to reproduce
+    previous_by_id = {record.job_id: record for record in previous}
+    current_by_id = {record.job_id: record for record in current}
+    return {
+        CHANGE_ADDED: current_by_id.keys() - previous_by_id.keys(),
+        CHANGE_MODIFIED: {job_id for job_id in current_by_id.keys() & previous_by_id.keys()
+                          if current_by_id[job_id] != previous_by_id[job_id]},
+        CHANGE_REMOVED: previous_by_id.keys() - current_by_id.keys(),
+    }
+
+
+def measure_run(label: str, job_records: list[JobRecord], index_path: str, feed_path: str) -> dict[str, set[str]]:
+    start_time = time.perf_counter()
+    stats = write_job_records_change_feed(batched(job_records, BATCH_SIZE), index_path, feed_path)
+    execution_time = time.perf_counter() - start_time
+    changes = {CHANGE_ADDED: set(), CHANGE_MODIFIED: set(), CHANGE_REMOVED: set()}
+    for change, job_id, _ in iterate_change_feed(feed_path):
+        changes[change].add(job_id)
+    print(f"{label:<28} {execution_time:6.3f}s, {stats['records']} records, {stats['duplicates']} duplicates, "
+          f"feed: {stats[CHANGE_ADDED]} added, {stats[CHANGE_MODIFIED]} modified, {stats[CHANGE_REMOVED]} removed, "
+          f"{os.path.getsize(feed_path) / 1024:,.0f} KiB")
+    return changes
+
+
+def measure_full_export(job_records: list[JobRecord], file_path: str) -> None:
+    start_time = time.perf_counter()
+    row_count = write_job_records_json_lines(batched(job_records, BATCH_SIZE), file_path)
+    execution_time = time.perf_counter() - start_time
+    print(f"{'full export (json lines)':<28} {execution_time:6.3f}s, {row_count} rows, "
+          f"{os.path.getsize(file_path) / 1024:,.0f} KiB")
+
+
+if __name__ == '__main__':
+    first_run = build_job_records(range(RECORD_COUNT))
+    # 1% of postings change title, 1% disappear and as many new ones appear
+    second_run = [
+        JobRecord(record.job_id, record.job_title + ' (CDI)', record.href) if i % CHURN_EVERY == 0 else record
+        for i, record in enumerate(first_run) if i % CHURN_EVERY != 1
+    ] + build_job_records(range(RECORD_COUNT, RECORD_COUNT + RECORD_COUNT // CHURN_EVERY))
+
+    with tempfile.TemporaryDirectory() as folder:
+        index_path = (Path(folder) / 'job_index.db').as_posix()
+        feed_path = (Path(folder) / 'job_changes.jsonl').as_posix()
+        measure_full_export(with_duplicates(first_run), (Path(folder) / 'job_records.jsonl').as_posix())
+        runs = [
+            ('first run (empty index)', [], first_run),
+            ('re-run, nothing changed', first_run, first_run),
+            (f're-run, ~{300 // CHURN_EVERY}% churn', first_run, second_run),
+        ]
+        for label, previous, current in runs:
+            if measure_run(label, with_duplicates(current), index_path, feed_path) != expected_changes(previous, current):
+                raise AssertionError(f"Change feed of '{label}' differs from a full comparison")
@@ -0,0 +1,28 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from main import iterate_job_records, iterate_job_records_in_parallel
+from synthetic_corpus import generate_corpus
+
+FILE_COUNT = 3000
+
+
+def measure(label: str, files: list[Path], job_records) -> list[tuple[str, str, str]]:
+    start_time = time.perf_counter()
+    result = [(record.job_id, record.href, record.job_title) for record in job_records]
+    execution_time = time.perf_counter() - start_time
+    print(f"{label:<12} {len(files)} files, {len(result)} records in {execution_time:.3f} seconds "
+          f"({len(files) / execution_time:.0f} files/sec)")
+    return result
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        files = generate_corpus(Path(corpus_dir), FILE_COUNT)
+        expected = measure('serial', files, iterate_job_records(files))
+        for workers in range(1, (os.cpu_count() or 1) + 1):
+            result = measure(f'workers={workers}', files, iterate_job_records_in_parallel(files, workers))
+            if result != expected:
+                raise AssertionError(f"Parallel results with {workers} workers differ from serial results")
@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from main import (JobRecord, PARQUET_ROW_GROUP_SIZE, batched, read_job_records, read_job_records_table,
+                  write_job_records_json, write_job_records_parquet)
+
+RECORD_COUNT = 500_000
+TITLE = 'Agent de production 7 H/F'
+TITLE_KEYWORD = 'Cariste'
+PROFESSIONS = ['Agent de production', 'Cariste', 'Préparateur de commandes', 'Opérateur de ligne', 'Magasinier',
+               'Manutentionnaire', 'Conducteur de machine', 'Technicien de maintenance', 'Soudeur', 'Électricien']
+
+
+def build_job_records() -> list[JobRecord]:
+    return [
+        JobRecord(str(job_id), f'{PROFESSIONS[job_id % len(PROFESSIONS)]} {job_id % 97} H/F',
+                  f'https://www.lejobadequat.com/emplois/{job_id}-{PROFESSIONS[job_id % len(PROFESSIONS)].lower()}')
+        for job_id in range(RECORD_COUNT)
+    ]
+
+
+def measure(label: str, load):
+    start_time = time.perf_counter()
+    result = load()
+    execution_time = time.perf_counter() - start_time
+    print(f"{label:<40} {execution_time * 1000:8.1f} ms, {len(result)} rows")
+    return result
+
+
+def load_json_titles_matching(file_path: str, matches) -> list[dict]:
+    with open(file_path, encoding='utf-8') as file:
+        return [record for record in json.load(file) if matches(record['job_title'])]
+
+
+if __name__ == '__main__':
+    job_records = build_job_records()
+    with tempfile.TemporaryDirectory() as folder:
+        json_path = (Path(folder) / 'job_records.json').as_posix()
+        parquet_path = (Path(folder) / 'job_records.parquet').as_posix()
+
+        start_time = time.perf_counter()
+        write_job_records_json(batched(job_records, 1000), json_path)
+        print(f"{'write json':<40} {(time.perf_counter() - start_time) * 1000:8.1f} ms, "
+              f"{os.path.getsize(json_path) / 1024 / 1024:.1f} MiB")
+        start_time = time.perf_counter()
+        write_job_records_parquet(batched(job_records, PARQUET_ROW_GROUP_SIZE), parquet_path)
+        print(f"{'write parquet':<40} {(time.perf_counter() - start_time) * 1000:8.1f} ms, "
+              f"{os.path.getsize(parquet_path) / 1024 / 1024:.1f} MiB")
+
+        expected = measure('json: load everything', lambda: json.load(open(json_path, encoding='utf-8')))
+        records = measure('parquet: load everything', lambda: read_job_records(parquet_path))
+        if [record.to_dict() for record in records] != expected:
+            raise AssertionError("Parquet returned different records than JSON")
+        measure('parquet: load everything (arrow table)', lambda: read_job_records_table(parquet_path))
+
+        expected = measure('json: load, filter title ==', lambda: load_json_titles_matching(
+            json_path, lambda title: title == TITLE))
+        table = measure('parquet: title == (pushed down)', lambda: read_job_records_table(
+            parquet_path, predicate=pc.field('job_title') == TITLE))
+        if table.to_pylist() != expected:
+            raise AssertionError("Parquet equality filter returned different records than JSON")
+
+        expected = measure('json: load, filter title contains', lambda: load_json_titles_matching(
+            json_path, lambda title: TITLE_KEYWORD in title))
+        table = measure('parquet: title contains, ids only', lambda: read_job_records_table(
+            parquet_path, ['job_id'], pc.match_substring(pc.field('job_title').cast(pa.string()), TITLE_KEYWORD)))
+        if table.column('job_id').to_pylist() != [record['job_id'] for record in expected]:
+            raise AssertionError("Parquet substring filter returned different records than JSON")
@@ -0,0 +1,35 @@
+import random
+import time
+
+from job_card_scanner import scan_job_cards
+from main import find_job_cards_with_regex
+from synthetic_corpus import render_job_card
+
+SIZES = [250, 500, 1000, 2000]
+
+
+def build_worst_case_template(article_count: int) -> str:
+    # Cards that never reach a jobCard_link make every article start rescan the rest of the template
+    return '<article id="post-1" class="jobCard"><a href="x">broken</a></article>\n' * article_count
+
+
+def measure(find_job_cards, template: str) -> float:
+    start_time = time.perf_counter()
+    find_job_cards(template)
+    return time.perf_counter() - start_time
+
+
+if __name__ == '__main__':
+    rng = random.Random(42)
+    template = ''.join(render_job_card(job_id, rng) for job_id in range(5000))
+    if scan_job_cards(template) != find_job_cards_with_regex(template):
+        raise AssertionError("Scanner and regex results differ on the synthetic template")
+    print(f"well-formed, 5000 cards: regex {measure(find_job_cards_with_regex, template):.4f}s, "
+          f"scanner {measure(scan_job_cards, template):.4f}s")
+
+    print(f"{'articles':>8} {'regex':>10} {'scanner':>10}")
+    for size in SIZES:
+        template = build_worst_case_template(size)
+        regex_time = measure(find_job_cards_with_regex, template)
+        scanner_time = measure(scan_job_cards, template)
+        print(f"{size:>8} {regex_time:>9.4f}s {scanner_time:>9.4f}s")
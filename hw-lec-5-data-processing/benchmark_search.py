@@ -0,0 +1,119 @@
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import text
+
+from main import (Base, JobRecord, batched, build_job_records_upsert, count_job_records_matching,
+                  create_engine_with_pragmas, create_sqlite_engine, search_job_records, upsert_job_records)
+from synthetic_corpus import CITIES, CONTRACTS, TITLES
+
+RECORD_COUNT = 1_000_000
+BATCH_SIZE = 10_000
+REPEATS = 5
+RARE_TITLE = 'Cordiste'
+RARE_EVERY = 10_000
+# (label, search query, LIKE pattern matching the same rows)
+QUERIES = [
+    ('common word', 'cariste', '%cariste%'),
+    ('prefix', 'manut', '%manut%'),
+    ('two words', 'soudeur lyon', None),
+    ('rare word', 'cordiste', '%cordiste%'),
+]
+
+
+def build_job_records() -> list[JobRecord]:
+    job_records = []
+    for job_id in range(RECORD_COUNT):
+        title = RARE_TITLE if job_id % RARE_EVERY == 0 else TITLES[job_id % len(TITLES)]
+        city = CITIES[job_id // len(TITLES) % len(CITIES)]
+        contract = CONTRACTS[job_id // 7 % len(CONTRACTS)]
+        job_records.append(JobRecord(str(job_id), f'{title} {contract} {city} H/F',
+                                     f'https://www.lejobadequat.com/emplois/{job_id}'))
+    return job_records
+
+
+def upsert_without_search_index(connection, job_records: list[JobRecord]) -> int:
+    # The loader as it was before the search index
+    rows = [{'job_id': record.job_id, 'job_title': record.job_title, 'href': record.href} for record in job_records]
+    return connection.execute(build_job_records_upsert(), rows).rowcount
+
+
+def load(engine, job_records: list[JobRecord], upsert) -> float:
+    start_time = time.perf_counter()
+    with engine.begin() as connection:
+        for batch in batched(job_records, BATCH_SIZE):
+            upsert(connection, batch)
+    return time.perf_counter() - start_time
+
+
+def median_ms(run) -> float:
+    timings = []
+    for _ in range(REPEATS):
+        start_time = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - start_time)
+    return statistics.median(timings) * 1000
+
+
+def like_page(connection, pattern: str, page: int) -> list:
+    # What searching the bare table looks like: a scan in id order, no ranking
+    return connection.execute(text('SELECT job_id, job_title, href FROM job_records WHERE job_title LIKE :pattern '
+                                   'ORDER BY id LIMIT 20 OFFSET :offset'),
+                              {'pattern': pattern, 'offset': (page - 1) * 20}).all()
+
+
+def like_count(connection, pattern: str) -> int:
+    return connection.execute(text('SELECT COUNT(*) FROM job_records WHERE job_title LIKE :pattern'),
+                              {'pattern': pattern}).scalar_one()
+
+
+def two_words_like_count(connection) -> int:
+    return connection.execute(text("SELECT COUNT(*) FROM job_records WHERE job_title LIKE '%soudeur%' "
+                                   "AND job_title LIKE '%lyon%'")).scalar_one()
+
+
+if __name__ == '__main__':
+    job_records = build_job_records()
+    with tempfile.TemporaryDirectory() as folder:
+        plain_engine = create_engine_with_pragmas((Path(folder) / 'plain.db').as_posix())
+        Base.metadata.create_all(plain_engine)
+        search_engine = create_sqlite_engine((Path(folder) / 'search.db').as_posix())
+        print(f"{'':<24} {'without index':>14} {'with index':>11}")
+        print(f"{'load':<24} {load(plain_engine, job_records, upsert_without_search_index):13.2f}s "
+              f"{load(search_engine, job_records, upsert_job_records):10.2f}s")
+        print(f"{'re-run, unchanged':<24} {load(plain_engine, job_records, upsert_without_search_index):13.2f}s "
+              f"{load(search_engine, job_records, upsert_job_records):10.2f}s")
+        # 1 title in 1000 changes, the index has to drop the old words and pick up the new ones
+        changed_job_records = [JobRecord(record.job_id, record.job_title.replace('H/F', 'Cordiste'), record.href)
+                               for record in job_records[1::1000]]
+        print(f"{'re-run, 0.1% changed':<24} "
+              f"{load(plain_engine, changed_job_records, upsert_without_search_index):13.2f}s "
+              f"{load(search_engine, changed_job_records, upsert_job_records):10.2f}s")
+
+        with plain_engine.connect() as plain, search_engine.connect() as search:
+            print(f"{'query':<14} {'matches':>8} {'LIKE p1':>9} {'FTS p1':>9} {'LIKE p50':>9} {'FTS p50':>9} "
+                  f"{'LIKE cnt':>9} {'FTS cnt':>9}")
+            for label, query, pattern in QUERIES:
+                count = count_job_records_matching(search, query)
+                expected = like_count(plain, pattern) if pattern else two_words_like_count(plain)
+                if count != expected:
+                    raise AssertionError(f"'{query}' matched {count} rows, LIKE matched {expected}")
+                fts_first = median_ms(lambda: search_job_records(search, query))
+                fts_deep = median_ms(lambda: search_job_records(search, query, page=50))
+                fts_count = median_ms(lambda: count_job_records_matching(search, query))
+                if pattern:
+                    like_first = f"{median_ms(lambda: like_page(plain, pattern, 1)):8.1f}ms"
+                    like_deep = f"{median_ms(lambda: like_page(plain, pattern, 50)):8.1f}ms"
+                    like_cnt = f"{median_ms(lambda: like_count(plain, pattern)):8.1f}ms"
+                else:
+                    like_first = like_deep = '-'
+                    like_cnt = f"{median_ms(lambda: two_words_like_count(plain)):8.1f}ms"
+                print(f"{label:<14} {count:>8} {like_first:>9} {fts_first:8.1f}ms {like_deep:>9} {fts_deep:8.1f}ms "
+                      f"{like_cnt:>9} {fts_count:8.1f}ms")
+
+            for job_record, rank in search_job_records(search, 'électricien (cdi', page_size=3):
+                print(f"{rank:8.3f} {job_record}")
+        plain_engine.dispose()
+        search_engine.dispose()
@@ -0,0 +1,99 @@
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from main import (JobRecord, batched, iterate_job_records_json_lines, write_job_records_json,
+                  write_job_records_json_lines)
+
+RECORD_COUNT = 500_000
+BATCH_SIZE = 1000
+
+
+class DictJobRecord:
+    # The former JobRecord: a plain class with a per-instance __dict__
+
+    def __init__(self, job_id: str, job_title: str, href: str):
+        self.job_id: str = job_id
+        self.job_title: str = job_title
+        self.href = href
+
+
+class DictJobRecordEncoder(json.JSONEncoder):
+    def default(self, obj):
+        if isinstance(obj, DictJobRecord):
+            return obj.__dict__
+        return json.JSONEncoder.default(self, obj)
+
+
+def write_job_records_json_per_record_encoder(job_record_batches, file_path: str) -> None:
+    # The former JSON writer: a new encoder per record through json.dumps(..., cls=...)
+    with Path(file_path).open('w', encoding='utf-8') as file:
+        file.write('[')
+        separator = '\n'
+        for job_records in job_record_batches:
+            for job_record in job_records:
+                file.write(separator)
+                file.write(json.dumps(job_record, cls=DictJobRecordEncoder, indent=False))
+                separator = ',\n'
+        file.write(']' if separator == '\n' else '\n]')
+
+
+def build_fields() -> list[tuple[str, str, str]]:
+    return [(str(job_id), f'Agent de production {job_id % 97} H/F',
+             f'https://www.lejobadequat.com/emplois/{job_id}-agent-de-production') for job_id in range(RECORD_COUNT)]
+
+
+def measure_record_memory(label: str, record_type, fields: list[tuple[str, str, str]]) -> list:
+    # The strings already exist, so only the record objects and the list holding them are counted
+    tracemalloc.start()
+    records = [record_type(*row) for row in fields]
+    allocated, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<36} {allocated / len(records):6.1f} bytes per record")
+    return records
+
+
+def measure_write(label: str, write, records: list, file_path: str) -> None:
+    start_time = time.perf_counter()
+    write(batched(records, BATCH_SIZE), file_path)
+    execution_time = time.perf_counter() - start_time
+    size = os.path.getsize(file_path)
+    print(f"{label:<36} {len(records) / execution_time:>10,.0f} records/s, "
+          f"{size / execution_time / 1024 / 1024:6.1f} MiB/s, {size / 1024 / 1024:.1f} MiB")
+
+
+def measure_read(label: str, read) -> int:
+    # Timed and traced in separate runs, tracemalloc slows allocation-heavy code down several times
+    start_time = time.perf_counter()
+    count = read()
+    execution_time = time.perf_counter() - start_time
+    tracemalloc.start()
+    read()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<36} {count / execution_time:>10,.0f} records/s, peak {peak / 1024 / 1024:.1f} MiB")
+    return count
+
+
+if __name__ == '__main__':
+    fields = build_fields()
+    dict_records = measure_record_memory('record with __dict__', DictJobRecord, fields)
+    records = measure_record_memory('record with __slots__', JobRecord, fields)
+
+    with tempfile.TemporaryDirectory() as folder:
+        legacy_path = (Path(folder) / 'legacy.json').as_posix()
+        json_path = (Path(folder) / 'job_records.json').as_posix()
+        json_lines_path = (Path(folder) / 'job_records.jsonl').as_posix()
+        measure_write('json, encoder per record', write_job_records_json_per_record_encoder, dict_records, legacy_path)
+        measure_write('json, shared encoder', write_job_records_json, records, json_path)
+        if Path(json_path).read_bytes() != Path(legacy_path).read_bytes():
+            raise AssertionError("JSON output differs from the former encoder")
+        measure_write('json lines', write_job_records_json_lines, records, json_lines_path)
+
+        measure_read('json.load whole file', lambda: len(json.load(open(json_path, encoding='utf-8'))))
+        measure_read('json lines, lazy', lambda: sum(1 for _ in iterate_job_records_json_lines(json_lines_path)))
+        if list(iterate_job_records_json_lines(json_lines_path)) != records:
+            raise AssertionError("JSON Lines reader returned different records")
@@ -0,0 +1,61 @@
+import tempfile
+import time
+from pathlib import Path
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from main import Base, JobRecord, JobRecordEntity, batched, create_sqlite_engine, upsert_job_records
+
+RECORD_COUNT = 200_000
+BATCH_SIZE = 1000
+
+
+def build_job_records(title_suffix: str = '') -> list[JobRecord]:
+    return [
+        JobRecord(str(job_id), f'Agent de production {job_id % 97} H/F{title_suffix}',
+                  f'https://www.lejobadequat.com/emplois/{job_id}-agent-de-production')
+        for job_id in range(RECORD_COUNT)
+    ]
+
+
+def load_with_orm_add_all(db_file_path: str, job_records: list[JobRecord]) -> None:
+    # Mirrors the former generate_sqllite_database_for_jobs_cache: recreate the file and add_all entities
+    engine = create_engine(f'sqlite:///{db_file_path}')
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([JobRecordEntity(job_id=r.job_id, job_title=r.job_title, href=r.href) for r in job_records])
+    session.commit()
+    session.close()
+    engine.dispose()
+
+
+def load_with_bulk_upsert(db_file_path: str, job_records: list[JobRecord]) -> int:
+    engine = create_sqlite_engine(db_file_path)
+    with engine.begin() as connection:
+        changed_rows = sum(upsert_job_records(connection, batch) for batch in batched(job_records, BATCH_SIZE))
+    engine.dispose()
+    return changed_rows
+
+
+def measure(label: str, load) -> None:
+    start_time = time.perf_counter()
+    changed_rows = load()
+    execution_time = time.perf_counter() - start_time
+    details = f', {changed_rows} rows changed' if changed_rows is not None else ''
+    print(f"{label:<28} {RECORD_COUNT} rows in {execution_time:.3f} seconds "
+          f"({RECORD_COUNT / execution_time:,.0f} rows/sec{details})")
+
+
+if __name__ == '__main__':
+    job_records = build_job_records()
+    changed_job_records = job_records[:]
+    changed_job_records[::100] = [JobRecord(r.job_id, r.job_title + ' (CDI)', r.href) for r in job_records[::100]]
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        orm_db = (Path(db_dir) / 'orm.db').as_posix()
+        bulk_db = (Path(db_dir) / 'bulk.db').as_posix()
+        measure('orm add_all (fresh file)', lambda: load_with_orm_add_all(orm_db, job_records))
+        measure('bulk upsert (fresh file)', lambda: load_with_bulk_upsert(bulk_db, job_records))
+        measure('bulk upsert (re-run)', lambda: load_with_bulk_upsert(bulk_db, job_records))
+        measure('bulk upsert (1% changed)', lambda: load_with_bulk_upsert(bulk_db, changed_job_records))
@@ -0,0 +1,85 @@
+ARTICLE_PREFIX = '<article id="post-'
+LINK_PREFIX = '<a'
+LINK_CLASS = 'class="jobCard_link"'
+TITLE_PREFIX = '<h3'
+TITLE_CLASS = 'class="jobCard_title">'
+TITLE_SUFFIX = '</h3>'
+
+
+def skip_whitespace(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos].isspace():
+        pos += 1
+    return pos
+
+
+def scan_job_id(text: str, pos: int) -> tuple[str, int] | None:
+    end = pos
+    while end < len(text) and text[end].isdecimal():
+        end += 1
+    if end == pos or not text.startswith('"', end):
+        return None
+    return text[pos:end], end + 1
+
+
+def scan_link(text: str, pos: int) -> tuple[str, int] | None:
+    while (start := text.find(LINK_PREFIX, pos)) != -1:
+        pos = start + 1
+        href_start = skip_whitespace(text, start + len(LINK_PREFIX))
+        if href_start == start + len(LINK_PREFIX) or not text.startswith('href="', href_start):
+            continue
+        href_start += len('href="')
+        href_end = text.find('"', href_start)
+        if href_end == -1:
+            return None
+        if href_end == href_start:
+            continue
+        tag_end = text.find('>', href_end + 1)
+        if tag_end == -1:
+            tag_end = len(text)
+        class_start = text.rfind(LINK_CLASS, href_end + 1, tag_end)
+        if class_start == -1:
+            if tag_end == len(text):
+                return None
+            continue
+        return text[href_start:href_end], class_start + len(LINK_CLASS)
+    return None
+
+
+def scan_title(text: str, pos: int) -> tuple[str, int] | None:
+    while (start := text.find(TITLE_PREFIX, pos)) != -1:
+        pos = start + 1
+        class_start = skip_whitespace(text, start + len(TITLE_PREFIX))
+        if class_start == start + len(TITLE_PREFIX) or not text.startswith(TITLE_CLASS, class_start):
+            continue
+        title_start = class_start + len(TITLE_CLASS)
+        title_end = text.find('<', title_start)
+        if title_end == -1:
+            return None
+        if title_end == title_start or not text.startswith(TITLE_SUFFIX, title_end):
+            continue
+        return text[title_start:title_end], title_end + len(TITLE_SUFFIX)
+    return None
+
+
+def scan_job_cards(text: str) -> list[tuple[str, str, str]]:
+    # Single forward pass producing the same (job_id, href, title) tuples as JOB_RECORD_REGEX.findall.
+    # Once a link or title can't be found after an article, no later article can match either,
+    # so scanning stops instead of retrying from every remaining position.
+    job_cards = []
+    pos = 0
+    while (start := text.find(ARTICLE_PREFIX, pos)) != -1:
+        job_id_match = scan_job_id(text, start + len(ARTICLE_PREFIX))
+        if job_id_match is None:
+            pos = start + 1
+            continue
+        job_id, pos = job_id_match
+        link_match = scan_link(text, pos)
+        if link_match is None:
+            break
+        href, pos = link_match
+        title_match = scan_title(text, pos)
+        if title_match is None:
+            break
+        title, pos = title_match
+        job_cards.append((job_id, href, title))
+    return job_cards
@@ -1,36 +1,62 @@
+import hashlib
 import json
+import os
 import re
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
-from typing import Callable
+from typing import Callable, Iterable, Iterator
 
-from sqlalchemy import Column, String, Integer, Text, create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+import zstandard
+from sqlalchemy import (Column, Connection, Engine, Index, Integer, LargeBinary, String, Text, bindparam,
+                        create_engine, event, func, or_, select, text)
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import declarative_base
+
+from job_card_scanner import scan_job_cards
 
 JOB_RECORD_REGEX = re.compile(r'<article id="post-(\d+)".*?<a\s+href="([^"]+)"[^>]*class="jobCard_link".*?<h3\s+class="jobCard_title">([^<]+)</h3>', re.DOTALL)
 
 
 class JobRecord:
+    # No per-instance __dict__: large exports keep millions of these alive at once
+    __slots__ = ('job_id', 'job_title', 'href')
 
     def __init__(self, job_id: str, job_title: str, href: str):
         self.job_id: str = job_id
         self.job_title: str = job_title
-        self.href = href
+        self.href: str = href
+
+    def to_dict(self) -> dict:
+        return {'job_id': self.job_id, 'job_title': self.job_title, 'href': self.href}
+
+    def __eq__(self, other):
+        if not isinstance(other, JobRecord):
+            return NotImplemented
+        return (self.job_id, self.job_title, self.href) == (other.job_id, other.job_title, other.href)
+
+    def __hash__(self):
+        return hash((self.job_id, self.job_title, self.href))
 
     def __repr__(self):
         return f"JobRecord(job_id={self.job_id}, job_title={self.job_title}, hrefs={self.href})"
 
 
-class JobRecordEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, JobRecord):
-            return obj.__dict__
-        return json.JSONEncoder.default(self, obj)
+JobCardFinder = Callable[[str], list[tuple[str, str, str]]]
+
 
+def find_job_cards_with_regex(text: str) -> list[tuple[str, str, str]]:
+    return JOB_RECORD_REGEX.findall(text)
 
-def extract_job_records(response: str) -> list[JobRecord]:
+
+def extract_job_records(response: str, find_job_cards: JobCardFinder = scan_job_cards) -> list[JobRecord]:
     response_body = json.loads(response)
     text = response_body['template']
-    matches = JOB_RECORD_REGEX.findall(text)
+    matches = find_job_cards(text)
     job_records: list[JobRecord] = []
     for match in matches:
         job_records.append(JobRecord(
@@ -41,88 +67,498 @@ def extract_job_records(response: str) -> list[JobRecord]:
     return job_records
 
 
+def read_cached_response(response_file: Path) -> str:
+    if response_file.suffix == '.zst':
+        return zstandard.ZstdDecompressor().decompress(response_file.read_bytes()).decode('utf-8')
+    return response_file.read_text('utf-8')
+
+
 JobRecordsConsumer = Callable[[list[JobRecord]], None]
+JobRecordBatchesConsumer = Callable[[Iterator[list[JobRecord]]], None]
 
+CACHE_FOLDER_PATH = Path('../hw-lec-4-http-requests/cache')
+DEFAULT_BATCH_SIZE = 1000
+DEFAULT_CHUNK_SIZE = 16
+FILE_PROCESSING_ERRORS = (KeyError, ValueError, OSError, zstandard.ZstdError)
+
+
+def iterate_cache_files(folder_path: Path = CACHE_FOLDER_PATH) -> Iterator[Path]:
+    for response_file in sorted(folder_path.rglob('*')):
+        if response_file.is_file() and not response_file.name.startswith('.tmp-'):
+            yield response_file
 
-def generate_database_for_jobs_cache(consumer: JobRecordsConsumer) -> None:
-    folder_path = Path('../hw-lec-4-http-requests/cache')
-    files: list[Path] = [f for f in folder_path.iterdir() if f.is_file()]
 
-    job_records = []
+def load_job_records(response_file: Path) -> list[JobRecord]:
+    return extract_job_records(read_cached_response(response_file))
+
+
+def iterate_job_records(files: Iterable[Path]) -> Iterator[JobRecord]:
     for response_file in files:
-        content = response_file.read_text('utf-8')
         try:
-            job_records += extract_job_records(content)
-        except KeyError as e:
-            print('Failed to process ' + response_file.as_posix())
-
-    consumer(job_records)
-
-
-def generate_json_database_for_jobs_cache() -> None:
-    def records_to_json_file_consumer(job_records: list[JobRecord]):
-        json_db_file_path = Path('job_records.json')
-        json_db_file_path.write_text(json.dumps(job_records, cls=JobRecordEncoder, indent=False), encoding='utf-8')
-
-    generate_database_for_jobs_cache(records_to_json_file_consumer)
-
-
-def generate_sqllite_database_for_jobs_cache() -> None:
-    Base = declarative_base()
-
-    class JobRecordEntity(Base):
-        __tablename__ = 'job_records'
-
-        id = Column(Integer, primary_key=True, autoincrement=True)
-        job_id = Column(String, nullable=True)
-        job_title = Column(String, nullable=True)
-        href = Column(Text, nullable=True)
-
-        def __init__(self, job_id=None, job_title=None, href=None):
-            self.job_id = job_id
-            self.job_title = job_title
-            self.href = href
-
-        def to_dict(self):
-            return {
-                'job_id': self.job_id,
-                'job_title': self.job_title,
-                'href': self.href
-            }
-
-        def __repr__(self):
-            return f"<JobRecord(job_id={self.job_id}, job_title={self.job_title}, hrefs={self.href})>"
-
-    def sqllite_persisting_record_consumer(job_records: list[JobRecord]):
-        def map_record_to_entity(record: JobRecord) -> JobRecordEntity:
-            return JobRecordEntity(
-                job_id=record.job_id,
-                job_title=record.job_title,
-                href=record.href
-            )
-
-        job_record_entities: list[JobRecordEntity] = [map_record_to_entity(record) for record in job_records]
-
-        db_file_path = 'job_records.db'
-        db_path = Path(db_file_path)
-        if db_path.exists():
-            db_path.unlink()
-            print(f"Existing database '{db_file_path}' has been deleted.")
-        engine = create_engine(f'sqlite:///{db_file_path}')
-        Session = sessionmaker(bind=engine)
-        Base.metadata.create_all(engine)
-        session = Session()
+            job_records = load_job_records(response_file)
+        except FILE_PROCESSING_ERRORS as e:
+            print(f'Failed to process {response_file.as_posix()}: {e!r}')
+            continue
+        yield from job_records
+
+
+def load_job_records_in_worker(response_file: Path) -> tuple[list[JobRecord], str | None]:
+    # Errors are returned as text so that one broken file does not fail the whole map
+    try:
+        return load_job_records(response_file), None
+    except FILE_PROCESSING_ERRORS as e:
+        return [], repr(e)
+
+
+def iterate_job_records_in_parallel(files: Iterable[Path], workers: int | None = None,
+                                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[JobRecord]:
+    workers = workers or os.cpu_count() or 1
+    # Files are submitted window by window so that pending results stay bounded for huge caches
+    window_size = workers * chunk_size * 4
+    files = iter(files)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        while window := list(islice(files, window_size)):
+            results = executor.map(load_job_records_in_worker, window, chunksize=chunk_size)
+            for response_file, (job_records, error) in zip(window, results):
+                if error is not None:
+                    print(f'Failed to process {response_file.as_posix()}: {error}')
+                    continue
+                yield from job_records
+
+
+def batched(job_records: Iterable[JobRecord], batch_size: int) -> Iterator[list[JobRecord]]:
+    if batch_size < 1:
+        raise ValueError(f"Batch size must be at least 1, but got {batch_size}")
+    iterator = iter(job_records)
+    while batch := list(islice(iterator, batch_size)):
+        yield batch
+
+
+def generate_database_for_jobs_cache(consumer: JobRecordsConsumer) -> None:
+    consumer(list(iterate_job_records(iterate_cache_files())))
+
+
+def stream_database_for_jobs_cache(consumer: JobRecordBatchesConsumer, batch_size: int = DEFAULT_BATCH_SIZE,
+                                   workers: int = 1) -> None:
+    files = iterate_cache_files()
+    job_records = iterate_job_records(files) if workers == 1 else iterate_job_records_in_parallel(files, workers)
+    consumer(batched(job_records, batch_size))
+
+
+JSON_DB_FILE_PATH = 'job_records.json'
+JSON_LINES_FILE_PATH = 'job_records.jsonl'
+WRITE_BUFFER_SIZE = 1024 * 1024
+# Built once: json.dumps(..., cls=...) constructs a new encoder for every record. indent=False puts every
+# key on its own line, which the C encoder reproduces with these separators plus the braces on their own lines
+JSON_ENCODER = json.JSONEncoder(separators=(',\n', ': '))
+JSON_LINES_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+
+def write_job_records_json(job_record_batches: Iterable[list[JobRecord]], file_path: str = JSON_DB_FILE_PATH) -> None:
+    # Produces the same layout as json.dumps(job_records, indent=False) without holding all records
+    with Path(file_path).open('w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as file:
+        file.write('[')
+        separator = '\n'
+        for job_records in job_record_batches:
+            if not job_records:
+                continue
+            file.write(separator)
+            file.write(',\n'.join(f'{{\n{JSON_ENCODER.encode(job_record.to_dict())[1:-1]}\n}}'
+                                  for job_record in job_records))
+            separator = ',\n'
+        file.write(']' if separator == '\n' else '\n]')
+
+
+def write_job_records_json_lines(job_record_batches: Iterable[list[JobRecord]],
+                                 file_path: str = JSON_LINES_FILE_PATH) -> int:
+    # One compact object per line, so readers and other tools can stream the file record by record
+    row_count = 0
+    with Path(file_path).open('w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as file:
+        for job_records in job_record_batches:
+            for job_record in job_records:
+                file.write(JSON_LINES_ENCODER.encode(job_record.to_dict()))
+                file.write('\n')
+            row_count += len(job_records)
+    return row_count
+
+
+def iterate_job_records_json_lines(file_path: str = JSON_LINES_FILE_PATH) -> Iterator[JobRecord]:
+    # Lazy: only the current line and record are held in memory
+    decoder = json.JSONDecoder()
+    with Path(file_path).open('r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                fields = decoder.decode(line)
+                yield JobRecord(fields['job_id'], fields['job_title'], fields['href'])
+
+
+def generate_json_database_for_jobs_cache(workers: int = 1) -> None:
+    stream_database_for_jobs_cache(write_job_records_json, workers=workers)
+
+
+def generate_json_lines_database_for_jobs_cache(workers: int = 1, file_path: str = JSON_LINES_FILE_PATH) -> None:
+    def records_to_json_lines_file_consumer(job_record_batches: Iterator[list[JobRecord]]):
+        row_count = write_job_records_json_lines(job_record_batches, file_path)
+        print(f"Job records have been saved to '{file_path}', {row_count} rows.")
+
+    stream_database_for_jobs_cache(records_to_json_lines_file_consumer, workers=workers)
+
+
+PARQUET_FILE_PATH = 'job_records.parquet'
+# One batch becomes one row group, large enough for efficient scans and small enough for useful statistics
+PARQUET_ROW_GROUP_SIZE = 64 * 1024
+# Titles repeat a lot across postings and are stored once per row group as dictionary pages. String
+# functions in predicates need pc.field('job_title').cast(pa.string()), they have no dictionary kernels
+JOB_RECORDS_SCHEMA = pa.schema([
+    pa.field('job_id', pa.string()),
+    pa.field('job_title', pa.dictionary(pa.int32(), pa.string())),
+    pa.field('href', pa.string()),
+])
+
+
+def job_records_to_table(job_records: list[JobRecord]) -> pa.Table:
+    return pa.table({
+        'job_id': pa.array([record.job_id for record in job_records], pa.string()),
+        'job_title': pa.array([record.job_title for record in job_records], pa.string()).dictionary_encode(),
+        'href': pa.array([record.href for record in job_records], pa.string()),
+    }, schema=JOB_RECORDS_SCHEMA)
+
+
+def write_job_records_parquet(job_record_batches: Iterable[list[JobRecord]],
+                              file_path: str = PARQUET_FILE_PATH) -> int:
+    # Every batch is flushed as its own row group, so memory stays bounded by the batch size
+    row_count = 0
+    with pq.ParquetWriter(file_path, JOB_RECORDS_SCHEMA, compression='zstd', use_dictionary=['job_title'],
+                          write_statistics=True) as writer:
+        for job_records in job_record_batches:
+            if job_records:
+                writer.write_table(job_records_to_table(job_records))
+                row_count += len(job_records)
+    return row_count
+
+
+def read_job_records_table(file_path: str = PARQUET_FILE_PATH, columns: list[str] | None = None,
+                           predicate: pc.Expression | None = None) -> pa.Table:
+    # The file is memory-mapped, only the projected columns are decoded, and row groups whose statistics
+    # exclude the predicate are skipped without being read
+    return pq.read_table(file_path, columns=columns, filters=predicate, memory_map=True)
+
+
+def read_job_records(file_path: str = PARQUET_FILE_PATH, predicate: pc.Expression | None = None) -> list[JobRecord]:
+    table = read_job_records_table(file_path, ['job_id', 'job_title', 'href'], predicate)
+    # Column-wise conversion, row dicts with a dictionary column are several times slower
+    columns = [table.column(name).cast(pa.string()).to_pylist() for name in ('job_id', 'job_title', 'href')]
+    return [JobRecord(job_id, job_title, href) for job_id, job_title, href in zip(*columns)]
+
+
+def generate_parquet_database_for_jobs_cache(workers: int = 1, file_path: str = PARQUET_FILE_PATH) -> None:
+    def records_to_parquet_file_consumer(job_record_batches: Iterator[list[JobRecord]]):
+        row_count = write_job_records_parquet(job_record_batches, file_path)
+        print(f"Job records have been saved to '{file_path}', {row_count} rows.")
+
+    stream_database_for_jobs_cache(records_to_parquet_file_consumer, batch_size=PARQUET_ROW_GROUP_SIZE,
+                                   workers=workers)
+
+
+Base = declarative_base()
+
+
+class JobRecordEntity(Base):
+    __tablename__ = 'job_records'
+    __table_args__ = (Index('ix_job_records_job_id', 'job_id', unique=True),)
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    job_id = Column(String, nullable=True)
+    job_title = Column(String, nullable=True)
+    href = Column(Text, nullable=True)
+
+    def __init__(self, job_id=None, job_title=None, href=None):
+        self.job_id = job_id
+        self.job_title = job_title
+        self.href = href
+
+    def to_dict(self):
+        return {
+            'job_id': self.job_id,
+            'job_title': self.job_title,
+            'href': self.href
+        }
+
+    def __repr__(self):
+        return f"<JobRecord(job_id={self.job_id}, job_title={self.job_title}, hrefs={self.href})>"
+
+
+SQLITE_DB_FILE_PATH = 'job_records.db'
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'temp_store': 'MEMORY',
+    'cache_size': -64 * 1024,
+}
+
+
+def create_engine_with_pragmas(db_file_path: str) -> Engine:
+    engine = create_engine(f'sqlite:///{db_file_path}')
+
+    @event.listens_for(engine, 'connect')
+    def apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in SQLITE_PRAGMAS.items():
+            cursor.execute(f'PRAGMA {name}={value}')
+        cursor.close()
+
+    return engine
+
+
+def create_sqlite_engine(db_file_path: str = SQLITE_DB_FILE_PATH) -> Engine:
+    engine = create_engine_with_pragmas(db_file_path)
+    Base.metadata.create_all(engine)
+    try:
+        # create_all skips indexes of tables that already exist, e.g. in databases built by older versions
+        for index in JobRecordEntity.__table__.indexes:
+            index.create(engine, checkfirst=True)
+    except IntegrityError:
+        # Databases filled by the former add_all loader can hold the same job several times, the latest row is kept
+        with engine.begin() as connection:
+            removed_rows = connection.execute(text(
+                "DELETE FROM job_records WHERE job_id IS NOT NULL AND id NOT IN "
+                "(SELECT MAX(id) FROM job_records WHERE job_id IS NOT NULL GROUP BY job_id)")).rowcount
+        print(f"Existing database '{db_file_path}' had duplicate job ids, {removed_rows} older rows removed.")
+        for index in JobRecordEntity.__table__.indexes:
+            index.create(engine, checkfirst=True)
+    create_job_records_search_index(engine)
+    return engine
+
+
+SEARCH_INDEX_TABLE = 'job_records_fts'
+SEARCH_PAGE_SIZE = 20
+# The index keeps its own copy of the titles, so a changed row can be dropped from it by rowid alone.
+# unicode61 with remove_diacritics lets 'electricien' find 'Électricien'
+SEARCH_INDEX_DDL = (f"CREATE VIRTUAL TABLE {SEARCH_INDEX_TABLE} USING fts5(job_title, "
+                    f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')")
+
+
+def create_job_records_search_index(engine: Engine) -> None:
+    # Databases built before the index existed are indexed once, when it is created
+    with engine.begin() as connection:
+        exists = connection.execute(text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                                    {'name': SEARCH_INDEX_TABLE}).first() is not None
+        if not exists:
+            connection.execute(text(SEARCH_INDEX_DDL))
+            connection.execute(text(f"INSERT INTO {SEARCH_INDEX_TABLE} (rowid, job_title) "
+                                    f"SELECT id, job_title FROM job_records"))
+
+
+def update_search_index(connection: Connection, changed_rows: list[tuple[int, str | None]],
+                        previous_max_id: int) -> None:
+    # Kept in sync by the loader rather than by triggers: FTS5 flushes its pending terms at every statement
+    # savepoint, and a trigger per row made bulk loads about seven times slower. Rows with an id above the
+    # previous maximum were just inserted and have nothing to remove from the index
+    # Plain DBAPI parameters: binding dictionaries through text() cost more than the FTS5 insert itself
+    updated_ids = [(row_id,) for row_id, _ in changed_rows if row_id <= previous_max_id]
+    if updated_ids:
+        connection.exec_driver_sql(f"DELETE FROM {SEARCH_INDEX_TABLE} WHERE rowid = ?", updated_ids)
+    if changed_rows:
+        connection.exec_driver_sql(f"INSERT INTO {SEARCH_INDEX_TABLE} (rowid, job_title) VALUES (?, ?)", changed_rows)
+
+
+def build_search_query(query: str, prefix: bool = True) -> str:
+    # Every word becomes a quoted FTS5 string, so user input cannot inject query syntax, and all words must match.
+    # With prefix the last word may be incomplete, as while typing
+    words = [word.replace('"', '""') for word in query.split()]
+    if not words:
+        return ''
+    terms = [f'"{word}"' for word in words]
+    if prefix:
+        terms[-1] += '*'
+    return ' '.join(terms)
+
+
+def search_job_records(connection: Connection, query: str, page: int = 1, page_size: int = SEARCH_PAGE_SIZE,
+                       prefix: bool = True) -> list[tuple[JobRecord, float]]:
+    # Best matches first by bm25, returned with their score (lower is better); pages are numbered from 1
+    if page < 1 or page_size < 1:
+        raise ValueError(f"Page and page size must be at least 1, but got {page} and {page_size}")
+    match = build_search_query(query, prefix)
+    if not match:
+        return []
+    rows = connection.execute(text(
+        f"SELECT r.job_id, r.job_title, r.href, {SEARCH_INDEX_TABLE}.rank FROM {SEARCH_INDEX_TABLE} "
+        f"JOIN job_records AS r ON r.id = {SEARCH_INDEX_TABLE}.rowid "
+        f"WHERE {SEARCH_INDEX_TABLE} MATCH :match ORDER BY {SEARCH_INDEX_TABLE}.rank, r.id "
+        f"LIMIT :limit OFFSET :offset"),
+        {'match': match, 'limit': page_size, 'offset': (page - 1) * page_size})
+    return [(JobRecord(job_id, job_title, href), rank) for job_id, job_title, href, rank in rows]
+
+
+def count_job_records_matching(connection: Connection, query: str, prefix: bool = True) -> int:
+    match = build_search_query(query, prefix)
+    if not match:
+        return 0
+    return connection.execute(
+        text(f"SELECT COUNT(*) FROM {SEARCH_INDEX_TABLE} WHERE {SEARCH_INDEX_TABLE} MATCH :match"),
+        {'match': match}).scalar_one()
+
+
+def build_job_records_upsert():
+    table = JobRecordEntity.__table__
+    statement = sqlite_insert(table)
+    # Rows whose title and href are unchanged are left untouched on re-runs
+    return statement.on_conflict_do_update(
+        index_elements=[table.c.job_id],
+        set_={'job_title': statement.excluded.job_title, 'href': statement.excluded.href},
+        where=or_(table.c.job_title.is_distinct_from(statement.excluded.job_title),
+                  table.c.href.is_distinct_from(statement.excluded.href)),
+    )
+
+
+def upsert_job_records(connection: Connection, job_records: list[JobRecord]) -> int:
+    rows = [{'job_id': record.job_id, 'job_title': record.job_title, 'href': record.href} for record in job_records]
+    if not rows:
+        return 0
+    table = JobRecordEntity.__table__
+    previous_max_id = connection.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar_one()
+    # RETURNING only yields the rows that were inserted or actually updated
+    changed_rows = connection.execute(build_job_records_upsert().returning(table.c.id, table.c.job_title),
+                                      rows).all()
+    # A job id that appears twice in the batch comes back once per occurrence, the last one holds the stored title
+    latest_titles = {row_id: job_title for row_id, job_title in changed_rows}
+    update_search_index(connection, list(latest_titles.items()), previous_max_id)
+    return len(changed_rows)
+
+
+def generate_sqllite_database_for_jobs_cache(workers: int = 1, db_file_path: str = SQLITE_DB_FILE_PATH) -> None:
+    def sqllite_bulk_loading_consumer(job_record_batches: Iterator[list[JobRecord]]):
+        engine = create_sqlite_engine(db_file_path)
         try:
-            session.add_all(job_record_entities)
-            session.commit()
-            print("Job records have been saved to the database.")
+            with engine.begin() as connection:
+                changed_rows = sum(upsert_job_records(connection, job_records) for job_records in job_record_batches)
+            print(f"Job records have been saved to the database, {changed_rows} rows inserted or updated.")
         except Exception as e:
             print(f"An error occurred while saving job records to the database: {e}")
-            session.rollback()
         finally:
-            session.close()
-
-    generate_database_for_jobs_cache(sqllite_persisting_record_consumer)
+            engine.dispose()
+
+    stream_database_for_jobs_cache(sqllite_bulk_loading_consumer, workers=workers)
+
+
+JOB_INDEX_DB_FILE_PATH = 'job_index.db'
+CHANGE_FEED_FILE_PATH = 'job_changes.jsonl'
+CHANGE_ADDED = 'added'
+CHANGE_MODIFIED = 'modified'
+CHANGE_REMOVED = 'removed'
+
+JobIndexBase = declarative_base()
+
+
+class JobIndexEntry(JobIndexBase):
+    # What the previous run saw for every job id, only a fingerprint of its title and href
+    __tablename__ = 'job_index'
+
+    job_id = Column(String, primary_key=True)
+    fingerprint = Column(LargeBinary, nullable=False)
+
+
+def fingerprint_job_record(job_record: JobRecord) -> bytes:
+    # 64 bits are plenty to tell two versions of one posting apart; the unit separator keeps title and href apart
+    return hashlib.blake2b(f'{job_record.job_title}\x1f{job_record.href}'.encode('utf-8'), digest_size=8).digest()
+
+
+def create_job_index_engine(db_file_path: str = JOB_INDEX_DB_FILE_PATH) -> Engine:
+    engine = create_engine_with_pragmas(db_file_path)
+    JobIndexBase.metadata.create_all(engine)
+    return engine
+
+
+def load_job_index(connection: Connection) -> dict[str, bytes]:
+    table = JobIndexEntry.__table__
+    return dict(connection.execute(select(table.c.job_id, table.c.fingerprint)).all())
+
+
+def save_job_index_changes(connection: Connection, upserted: dict[str, bytes], removed: list[str]) -> None:
+    table = JobIndexEntry.__table__
+    if upserted:
+        statement = sqlite_insert(table)
+        connection.execute(
+            statement.on_conflict_do_update(index_elements=[table.c.job_id],
+                                            set_={'fingerprint': statement.excluded.fingerprint}),
+            [{'job_id': job_id, 'fingerprint': fingerprint} for job_id, fingerprint in upserted.items()])
+    if removed:
+        connection.execute(table.delete().where(table.c.job_id == bindparam('removed_job_id')),
+                           [{'removed_job_id': job_id} for job_id in removed])
+
+
+def write_job_records_change_feed(job_record_batches: Iterable[list[JobRecord]],
+                                  index_file_path: str = JOB_INDEX_DB_FILE_PATH,
+                                  feed_file_path: str = CHANGE_FEED_FILE_PATH) -> dict[str, int]:
+    # Compares the run against the index of the previous one and writes only the differences, one JSON object
+    # per line. Lookups and duplicate checks are dict operations, and the index is updated with the changed
+    # rows only, after the feed has been written: a run that fails half-way emits the same feed again
+    engine = create_job_index_engine(index_file_path)
+    try:
+        with engine.connect() as connection:
+            previous = load_job_index(connection)
+        seen: dict[str, bytes] = {}
+        upserted: dict[str, bytes] = {}
+        stats = {'records': 0, 'duplicates': 0, 'conflicting_duplicates': 0,
+                 CHANGE_ADDED: 0, CHANGE_MODIFIED: 0, CHANGE_REMOVED: 0}
+        with Path(feed_file_path).open('w', encoding='utf-8', buffering=WRITE_BUFFER_SIZE) as file:
+            for job_records in job_record_batches:
+                for job_record in job_records:
+                    stats['records'] += 1
+                    fingerprint = fingerprint_job_record(job_record)
+                    seen_fingerprint = seen.get(job_record.job_id)
+                    if seen_fingerprint is not None:
+                        # The same posting on several cached pages, the first occurrence wins
+                        stats['duplicates'] += 1
+                        if seen_fingerprint != fingerprint:
+                            stats['conflicting_duplicates'] += 1
+                        continue
+                    seen[job_record.job_id] = fingerprint
+                    previous_fingerprint = previous.pop(job_record.job_id, None)
+                    if previous_fingerprint == fingerprint:
+                        continue
+                    change = CHANGE_ADDED if previous_fingerprint is None else CHANGE_MODIFIED
+                    stats[change] += 1
+                    upserted[job_record.job_id] = fingerprint
+                    file.write(JSON_LINES_ENCODER.encode({'change': change, **job_record.to_dict()}))
+                    file.write('\n')
+            # Whatever is left of the previous index did not appear in this run
+            removed = sorted(previous)
+            for job_id in removed:
+                file.write(JSON_LINES_ENCODER.encode({'change': CHANGE_REMOVED, 'job_id': job_id}))
+                file.write('\n')
+            stats[CHANGE_REMOVED] = len(removed)
+        with engine.begin() as connection:
+            save_job_index_changes(connection, upserted, removed)
+        return stats
+    finally:
+        engine.dispose()
+
+
+def iterate_change_feed(file_path: str = CHANGE_FEED_FILE_PATH) -> Iterator[tuple[str, str, JobRecord | None]]:
+    # (change, job_id, record), the record is None for removed postings
+    decoder = json.JSONDecoder()
+    with Path(file_path).open('r', encoding='utf-8') as file:
+        for line in file:
+            if line.strip():
+                fields = decoder.decode(line)
+                if fields['change'] == CHANGE_REMOVED:
+                    yield fields['change'], fields['job_id'], None
+                else:
+                    yield fields['change'], fields['job_id'], JobRecord(
+                        fields['job_id'], fields['job_title'], fields['href'])
+
+
+def generate_change_feed_for_jobs_cache(workers: int = 1, index_file_path: str = JOB_INDEX_DB_FILE_PATH,
+                                        feed_file_path: str = CHANGE_FEED_FILE_PATH) -> None:
+    def change_feed_consumer(job_record_batches: Iterator[list[JobRecord]]):
+        stats = write_job_records_change_feed(job_record_batches, index_file_path, feed_file_path)
+        print(f"Change feed has been saved to '{feed_file_path}': {stats[CHANGE_ADDED]} added, "
+              f"{stats[CHANGE_MODIFIED]} modified, {stats[CHANGE_REMOVED]} removed out of {stats['records']} "
+              f"records ({stats['duplicates']} duplicates collapsed).")
+
+    stream_database_for_jobs_cache(change_feed_consumer, workers=workers)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,53 @@
+import json
+import random
+from pathlib import Path
+
+JOB_CARD_TEMPLATE = '''<article id="post-{job_id}" class="jobCard post-{job_id} offre type-offre status-publish hentry">
+    <div class="jobCard_header">
+        <span class="jobCard_tag">{contract}</span>
+        <span class="jobCard_date">Publiée le {day:02d}/07/2024</span>
+    </div>
+    <a href="https://www.lejobadequat.com/emplois/{job_id}-{slug}" title="{title}" class="jobCard_link">
+        <div class="jobCard_content">
+            <h3 class="jobCard_title">{title}</h3>
+            <p class="jobCard_location">{city} ({department})</p>
+        </div>
+    </a>
+    <div class="jobCard_footer">{padding}</div>
+</article>
+'''
+
+TITLES = ['Préparateur de commandes', 'Cariste', 'Agent de production', 'Manutentionnaire', 'Soudeur',
+          'Conducteur de ligne', 'Électricien', 'Assistant administratif', 'Chauffeur PL', 'Magasinier']
+CITIES = ['Lyon', 'Paris', 'Lille', 'Nantes', 'Bordeaux', 'Rennes', 'Marseille', 'Toulouse']
+CONTRACTS = ['CDI', 'CDD', 'Intérim']
+
+
+def render_job_card(job_id: int, rng: random.Random, padding_size: int = 200) -> str:
+    title = f"{rng.choice(TITLES)} H/F"
+    return JOB_CARD_TEMPLATE.format(
+        job_id=job_id,
+        slug=title.lower().replace(' ', '-').replace('/', '-'),
+        title=title,
+        contract=rng.choice(CONTRACTS),
+        day=rng.randint(1, 28),
+        city=rng.choice(CITIES),
+        department=rng.randint(1, 95),
+        padding='x' * padding_size,
+    )
+
+
+def render_response(first_job_id: int, jobs_per_page: int, rng: random.Random) -> str:
+    cards = [render_job_card(job_id, rng) for job_id in range(first_job_id, first_job_id + jobs_per_page)]
+    return json.dumps({'facets': {}, 'template': ''.join(cards), 'settings': {'pager': {}}})
+
+
+def generate_corpus(folder_path: Path, file_count: int, jobs_per_page: int = 12, seed: int = 42) -> list[Path]:
+    rng = random.Random(seed)
+    folder_path.mkdir(parents=True, exist_ok=True)
+    files = []
+    for i in range(file_count):
+        response_file = folder_path / f'response_{i:06d}.json'
+        response_file.write_text(render_response(i * jobs_per_page, jobs_per_page, rng), encoding='utf-8')
+        files.append(response_file)
+    return files
@@ -0,0 +1,22 @@
+from main import JobRecord, count_job_records_matching, create_sqlite_engine, search_job_records, upsert_job_records
+
+
+def test_duplicate_job_id_in_one_batch_keeps_the_last_title(tmp_path):
+    engine = create_sqlite_engine((tmp_path / 'job_records.db').as_posix())
+    try:
+        with engine.begin() as connection:
+            upsert_job_records(connection, [JobRecord('1', 'Dev A', 'h1'), JobRecord('1', 'Dev B', 'h1')])
+        with engine.connect() as connection:
+            assert [record for record, _ in search_job_records(connection, 'dev')] == [JobRecord('1', 'Dev B', 'h1')]
+            assert count_job_records_matching(connection, 'a', prefix=False) == 0
+
+        # The same id again, already stored: the old title has to leave the index
+        with engine.begin() as connection:
+            upsert_job_records(connection, [JobRecord('1', 'Soudeur', 'h1'), JobRecord('1', 'Cariste', 'h1')])
+        with engine.connect() as connection:
+            assert count_job_records_matching(connection, 'dev') == 0
+            assert count_job_records_matching(connection, 'soudeur') == 0
+            assert [record for record, _ in search_job_records(connection, 'cariste')] == [
+                JobRecord('1', 'Cariste', 'h1')]
+    finally:
+        engine.dispose()
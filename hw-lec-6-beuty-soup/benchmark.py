@@ -0,0 +1,70 @@
+import time
+
+import requests
+from bs4 import BeautifulSoup
+
+from main import extract_topics, scrape_sport_topics
+from stub_server import render_article_page, start_stub_server
+
+ARTICLE_COUNT = 200
+LATENCY = 0.05
+PARSE_ROUNDS = 20
+
+
+def extract_topics_with_html_parser(content: bytes) -> list[str] | None:
+    # The former parsing path: full html.parser tree of the article page
+    article_soup = BeautifulSoup(content, "html.parser")
+    topic_panel = article_soup.find('div', {'data-component': 'topic-list'})
+    if topic_panel is None:
+        return None
+    topic_list = topic_panel.find('ul', {'role': 'list'})
+    return [topic.text for topic in topic_list.find_all('li')]
+
+
+def scrape_sport_topics_serially(base_url: str, limit: int) -> list[dict]:
+    # The former fetching path: bare requests.get per article, no session reuse
+    response = requests.get(f"{base_url}/sport")
+    soup = BeautifulSoup(response.content, "html.parser")
+    results = []
+    for article in soup.find_all('div', type='article', limit=limit):
+        link = base_url + article.find_next('a').get('href')
+        topics = extract_topics_with_html_parser(requests.get(link).content)
+        if topics is not None:
+            results.append({"Link": link, "Topics": topics})
+    return results
+
+
+def measure_parse(label: str, extract, content: bytes) -> list[str] | None:
+    start_time = time.perf_counter()
+    for _ in range(PARSE_ROUNDS):
+        topics = extract(content)
+    execution_time = (time.perf_counter() - start_time) / PARSE_ROUNDS
+    print(f"{label:<24} {execution_time * 1000:.2f} ms per {len(content) // 1024} KB page")
+    return topics
+
+
+def measure_scrape(label: str, scrape) -> list[dict]:
+    start_time = time.perf_counter()
+    results = scrape()
+    execution_time = time.perf_counter() - start_time
+    print(f"{label:<24} {len(results)} articles in {execution_time:.2f} seconds "
+          f"({len(results) / execution_time:.1f} articles/sec)")
+    return results
+
+
+if __name__ == '__main__':
+    content = render_article_page(1).encode('utf-8')
+    expected = measure_parse('html.parser full tree', extract_topics_with_html_parser, content)
+    if measure_parse('lxml topic query', extract_topics, content) != expected:
+        raise AssertionError("Lean parsing returned different topics")
+
+    server, base_url = start_stub_server(article_count=ARTICLE_COUNT, latency=LATENCY)
+    try:
+        expected = measure_scrape('serial, html.parser', lambda: scrape_sport_topics_serially(base_url, ARTICLE_COUNT))
+        for max_workers in [4, 16]:
+            results = measure_scrape(f'{max_workers} workers, lean',
+                                     lambda: scrape_sport_topics(base_url, ARTICLE_COUNT, max_workers))
+            if results != expected:
+                raise AssertionError("Concurrent scrape returned different results")
+    finally:
+        server.shutdown()
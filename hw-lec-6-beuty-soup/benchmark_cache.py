@@ -0,0 +1,56 @@
+import tempfile
+import time
+
+from http_cache import RevalidatingCache
+from main import scrape_sport_topics
+from stub_server import start_stub_server
+
+ARTICLE_COUNT = 200
+LATENCY = 0.05
+MAX_WORKERS = 16
+UPDATED_EVERY = 10
+
+
+def measure_run(label: str, base_url: str, cache_dir: str) -> list[dict]:
+    cache = RevalidatingCache(cache_dir)
+    start_time = time.perf_counter()
+    results = scrape_sport_topics(base_url, ARTICLE_COUNT, MAX_WORKERS, cache)
+    execution_time = time.perf_counter() - start_time
+    stats = cache.stats()
+    print(f"{label:<28} {execution_time:5.2f}s, {stats['not_modified']:>3}/{stats['requests']} not modified, "
+          f"{stats['bytes_transferred'] / 1024 / 1024:6.1f} MiB transferred, "
+          f"{stats['bytes_saved'] / 1024 / 1024:6.1f} MiB saved, "
+          f"parsed {stats['parses']:>3} pages in {stats['parse_seconds']:.2f}s, "
+          f"{stats['parse_hits']:>3} reused ({stats['parse_seconds_saved']:.2f}s saved)")
+    return results
+
+
+def scrape_uncached(base_url: str) -> list[dict]:
+    return scrape_sport_topics(base_url, ARTICLE_COUNT, MAX_WORKERS)
+
+
+if __name__ == '__main__':
+    with tempfile.TemporaryDirectory() as cache_dir:
+        server, base_url = start_stub_server(article_count=ARTICLE_COUNT, latency=LATENCY)
+        try:
+            expected = scrape_uncached(base_url)
+            if measure_run('cold cache', base_url, cache_dir) != expected:
+                raise AssertionError("Cold cached run returned different results")
+            if measure_run('warm, nothing changed', base_url, cache_dir) != expected:
+                raise AssertionError("Revalidated run returned different results")
+
+            for article_id in range(0, ARTICLE_COUNT, UPDATED_EVERY):
+                server.article_revisions[article_id] = 1
+            expected = scrape_uncached(base_url)
+            if measure_run(f'warm, 1 in {UPDATED_EVERY} updated', base_url, cache_dir) != expected:
+                raise AssertionError("Run after updates returned different results")
+        finally:
+            server.shutdown()
+
+        # Without validators every page is downloaded again, but unchanged content is still not re-parsed
+        server, base_url = start_stub_server(article_count=ARTICLE_COUNT, latency=LATENCY, validators=False)
+        try:
+            if measure_run('warm, server sends no ETag', base_url, cache_dir) != scrape_uncached(base_url):
+                raise AssertionError("Run without validators returned different results")
+        finally:
+            server.shutdown()
@@ -0,0 +1,151 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+import zstandard
+
+
+class CachedResponse:
+
+    def __init__(self, url: str, status_code: int, content: bytes, content_hash: str | None, not_modified: bool):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.content_hash = content_hash
+        self.not_modified = not_modified
+
+
+def write_atomically(path: Path, content: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'wb') as file:
+            file.write(content)
+        os.replace(tmp_name, path)
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+def transfer_size(response: requests.Response) -> int:
+    # Body bytes as received, before requests undoes any Content-Encoding; urllib3 counts them while reading
+    try:
+        return response.raw.tell() or len(response.content)
+    except AttributeError:
+        return len(response.content)
+
+
+class RevalidatingCache:
+    # Keeps every 200 response with its ETag / Last-Modified validators and revalidates it with a conditional
+    # request on the next run. Bodies are stored by content hash, and so are parse results, so a page that
+    # comes back unchanged (304, or the same bytes under a new validator) is neither downloaded nor re-parsed.
+
+    def __init__(self, root: str | Path, compression_level: int = 3):
+        self.root = Path(root)
+        self.compression_level = compression_level
+        self.requests = 0
+        self.not_modified = 0
+        self.bytes_transferred = 0
+        self.bytes_saved = 0
+        self.parses = 0
+        self.parse_hits = 0
+        self.parse_seconds = 0.0
+        self.parse_seconds_saved = 0.0
+        self._lock = threading.Lock()
+
+    def entry_path(self, url: str) -> Path:
+        return self.root / 'entries' / f'{hashlib.sha256(url.encode("utf-8")).hexdigest()}.json'
+
+    def body_path(self, content_hash: str) -> Path:
+        return self.root / 'bodies' / content_hash[:2] / f'{content_hash}.zst'
+
+    def parsed_path(self, parser_name: str, content_hash: str) -> Path:
+        return self.root / 'parsed' / parser_name / content_hash[:2] / f'{content_hash}.json'
+
+    def _load_entry(self, url: str) -> tuple[dict, bytes] | None:
+        try:
+            entry = json.loads(self.entry_path(url).read_bytes())
+            content = zstandard.ZstdDecompressor().decompress(self.body_path(entry['content_hash']).read_bytes())
+        except (FileNotFoundError, json.JSONDecodeError, zstandard.ZstdError):
+            return None
+        return entry, content
+
+    def fetch(self, session: requests.Session, url: str) -> CachedResponse:
+        cached = self._load_entry(url)
+        headers = {}
+        if cached is not None:
+            entry, _ = cached
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+
+        response = session.get(url, headers=headers)
+        with self._lock:
+            self.requests += 1
+            self.bytes_transferred += transfer_size(response)
+        if response.status_code == 304 and cached is not None:
+            entry, content = cached
+            with self._lock:
+                self.not_modified += 1
+                # What the full response would have cost, entries from before transfer_size count the body
+                self.bytes_saved += entry.get('transfer_size', len(content))
+            return CachedResponse(url, 200, content, entry['content_hash'], True)
+        if response.status_code != 200:
+            return CachedResponse(url, response.status_code, response.content, None, False)
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        body_path = self.body_path(content_hash)
+        if not body_path.exists():
+            compressor = zstandard.ZstdCompressor(level=self.compression_level)
+            write_atomically(body_path, compressor.compress(response.content))
+        entry = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'content_hash': content_hash,
+            'size': len(response.content),
+            'transfer_size': transfer_size(response),
+        }
+        write_atomically(self.entry_path(url), json.dumps(entry).encode('utf-8'))
+        return CachedResponse(url, 200, response.content, content_hash, False)
+
+    def parse(self, response: CachedResponse, parser_name: str, parse):
+        # parse must return something JSON serializable; None is cached as well
+        path = self.parsed_path(parser_name, response.content_hash)
+        try:
+            parsed = json.loads(path.read_bytes())
+            with self._lock:
+                self.parse_hits += 1
+                self.parse_seconds_saved += parsed['parse_seconds']
+            return parsed['result']
+        except (FileNotFoundError, json.JSONDecodeError):
+            pass
+
+        # CPU time of this thread, wall time would include waiting for the GIL behind other workers
+        start_time = time.thread_time()
+        result = parse(response.content)
+        parse_seconds = time.thread_time() - start_time
+        write_atomically(path, json.dumps({'result': result, 'parse_seconds': parse_seconds}).encode('utf-8'))
+        with self._lock:
+            self.parses += 1
+            self.parse_seconds += parse_seconds
+        return result
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'not_modified': self.not_modified,
+                'bytes_transferred': self.bytes_transferred,
+                'bytes_saved': self.bytes_saved,
+                'parses': self.parses,
+                'parse_hits': self.parse_hits,
+                'parse_seconds': self.parse_seconds,
+                'parse_seconds_saved': self.parse_seconds_saved,
+            }
@@ -1,37 +1,103 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
 from bs4 import BeautifulSoup
-import json
+from lxml import etree, html
+from requests.adapters import HTTPAdapter
+
+from http_cache import RevalidatingCache
 
-url = "https://www.bbc.com/sport"
+BASE_URL = "https://www.bbc.com"
+ARTICLE_LIMIT = 20
+MAX_WORKERS = 8
+CACHE_DIR = 'http_cache'
 
-response = requests.get(url)
+TOPIC_LIST_XPATH = etree.XPath('//div[@data-component="topic-list"]//ul[@role="list"]')
 
-if response.status_code == 200:
-    soup = BeautifulSoup(response.content, "html.parser")
 
-    articles = soup.find_all('div', type='article', limit=20)
+def create_pooled_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
 
-    results = []
 
+def extract_article_links(content: bytes, base_url: str = BASE_URL, limit: int = ARTICLE_LIMIT) -> list[str]:
+    soup = BeautifulSoup(content, "lxml")
+    articles = soup.find_all('div', type='article', limit=limit)
+
+    links = []
     for article in articles:
         ref_element = article.find_next('a')
-        link = "https://www.bbc.com" + ref_element.get('href')
+        if ref_element is None or not ref_element.get('href'):
+            continue
+        links.append(base_url + ref_element.get('href'))
+    return links
+
+
+def extract_topics(content: bytes) -> list[str] | None:
+    # A C-level lxml tree plus one precompiled query is several times cheaper than a soup of the whole page
+    if not content.strip():
+        return None
+    topic_lists = TOPIC_LIST_XPATH(html.fromstring(content))
+    if not topic_lists:
+        return None
+    return [topic.text_content() for topic in topic_lists[0].iterfind('.//li')]
 
-        print(f'requesting {link}')
-        article_response = requests.get(link)
-        article_soup = BeautifulSoup(article_response.content, "html.parser")
 
-        topic_panel = article_soup.find('div', {'data-component': 'topic-list'})
-        topic_list = topic_panel.find('ul', {'role':'list'})
-        topic_elements = topic_list.find_all('li')
+def fetch_article_topics(session: requests.Session, link: str, cache: RevalidatingCache | None = None) -> dict | None:
+    print(f'requesting {link}')
+    article_response = session.get(link) if cache is None else cache.fetch(session, link)
+    if article_response.status_code != 200:
+        print(f'skipping {link}: status {article_response.status_code}')
+        return None
+    if cache is None:
+        topics = extract_topics(article_response.content)
+    else:
+        topics = cache.parse(article_response, 'topics', extract_topics)
+    if topics is None:
+        print(f'skipping {link}: no topic panel')
+        return None
+    return {
+        "Link": link,
+        "Topics": topics
+    }
 
-        topics = [topic.text for topic in topic_elements]
 
-        results.append({
-            "Link": link,
-            "Topics": topics
-        })
+def fetch_article_links(session: requests.Session, base_url: str, limit: int,
+                        cache: RevalidatingCache | None = None) -> list[str]:
+    index_url = f"{base_url}/sport"
+    if cache is None:
+        response = session.get(index_url)
+        response.raise_for_status()
+        return extract_article_links(response.content, base_url, limit)
+    response = cache.fetch(session, index_url)
+    if response.status_code != 200:
+        raise requests.HTTPError(f'{response.status_code} for url: {index_url}')
+    # Cached as paths, the same index page may be served under another base URL
+    paths = cache.parse(response, f'article_paths_{limit}', lambda content: extract_article_links(content, '', limit))
+    return [base_url + path for path in paths]
+
+
+def scrape_sport_topics(base_url: str = BASE_URL, limit: int = ARTICLE_LIMIT, max_workers: int = MAX_WORKERS,
+                        cache: RevalidatingCache | None = None) -> list[dict]:
+    with create_pooled_session(max_workers) as session:
+        links = fetch_article_links(session, base_url, limit, cache)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda link: fetch_article_topics(session, link, cache), links)
+            return [result for result in results if result is not None]
+
+
+if __name__ == '__main__':
+    cache = RevalidatingCache(CACHE_DIR)
+    results = scrape_sport_topics(cache=cache)
+    stats = cache.stats()
+    print(f"{stats['not_modified']} of {stats['requests']} responses not modified, "
+          f"{stats['bytes_transferred']} bytes transferred, {stats['bytes_saved']} bytes saved, "
+          f"{stats['parse_hits']} parses reused ({stats['parse_seconds_saved']:.2f}s saved)")
 
     with open('news_topics.json', 'w', encoding='utf-8') as f:
         json.dump(results, f, ensure_ascii=False, indent=4)
-
@@ -0,0 +1,115 @@
+import hashlib
+import threading
+import time
+from email.utils import formatdate, parsedate_to_datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ARTICLE_PATH_PREFIX = '/sport/articles/'
+# Last-Modified of revision 0 of every page, each later revision is an hour newer
+PUBLISHED_AT = 1_700_000_000
+TOPICS = ['Football', 'Premier League', 'Tennis', 'Cricket', 'Formula 1', 'Rugby Union', 'Golf', 'Athletics']
+
+
+def render_index_page(article_count: int) -> str:
+    articles = ''.join(
+        f'<div type="article"><div class="promo"><a href="{ARTICLE_PATH_PREFIX}{i}"><span>Story {i}</span></a></div></div>'
+        for i in range(article_count)
+    )
+    return f'<html><head><title>BBC Sport</title></head><body><main>{articles}</main></body></html>'
+
+
+def render_article_page(article_id: int, padding_size: int = 200_000, with_topics: bool = True,
+                        revision: int = 0) -> str:
+    # Real article pages are mostly inline scripts, styles and body copy around a small topic panel
+    script = f'<script>window.__INITIAL_DATA__ = "{"x" * (padding_size // 2)}";</script>'
+    paragraphs = ''.join(f'<p class="ssrcss-paragraph">Paragraph {i} of story {article_id}.</p>'
+                         for i in range(padding_size // 2 // 40))
+    topic_panel = ''
+    if with_topics:
+        topics = ''.join(f'<li><a href="/sport/{topic.lower()}">{topic}</a></li>'
+                         for topic in TOPICS[article_id % 3:article_id % 3 + 3])
+        topic_panel = f'<div data-component="topic-list"><ul role="list">{topics}</ul></div>'
+    title = f'Story {article_id}' if revision == 0 else f'Story {article_id} (updated {revision})'
+    return (f'<html><head><title>{title}</title>{script}</head>'
+            f'<body><article>{paragraphs}{topic_panel}</article></body></html>')
+
+
+def create_stub_server(article_count: int = 200, latency: float = 0.05, padding_size: int = 200_000,
+                       missing_topics_every: int = 10, validators: bool = True, port: int = 0) -> ThreadingHTTPServer:
+    # Bump server.article_revisions[article_id] to change an article between runs
+    article_revisions: dict[int, int] = {}
+    rendered_articles: dict[tuple[int, int], bytes] = {}
+
+    def article_body(article_id: int, revision: int) -> bytes:
+        if (article_id, revision) not in rendered_articles:
+            with_topics = missing_topics_every == 0 or article_id % missing_topics_every != 0
+            page = render_article_page(article_id, padding_size, with_topics, revision)
+            rendered_articles[(article_id, revision)] = page.encode('utf-8')
+        return rendered_articles[(article_id, revision)]
+
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            time.sleep(latency)
+            if self.path == '/sport':
+                self.send_page(render_index_page(article_count).encode('utf-8'), 0)
+            elif self.path.startswith(ARTICLE_PATH_PREFIX) and self.path[len(ARTICLE_PATH_PREFIX):].isdigit():
+                article_id = int(self.path[len(ARTICLE_PATH_PREFIX):])
+                revision = article_revisions.get(article_id, 0)
+                self.send_page(article_body(article_id, revision), revision)
+            else:
+                self.send_body(b'Not found', 404)
+
+        def send_page(self, body: bytes, revision: int):
+            if not validators:
+                self.send_body(body)
+                return
+            etag = f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+            last_modified = PUBLISHED_AT + revision * 3600
+            headers = {'ETag': etag, 'Last-Modified': formatdate(last_modified, usegmt=True)}
+            # If-None-Match takes precedence over If-Modified-Since, as in RFC 9110
+            if_none_match = self.headers.get('If-None-Match')
+            if_modified_since = self.headers.get('If-Modified-Since')
+            if if_none_match is not None:
+                not_modified = etag in [tag.strip() for tag in if_none_match.split(',')]
+            elif if_modified_since is not None:
+                not_modified = parsedate_to_datetime(if_modified_since).timestamp() >= last_modified
+            else:
+                not_modified = False
+            if not_modified:
+                self.send_body(b'', 304, headers)
+            else:
+                self.send_body(body, 200, headers)
+
+        def send_body(self, body: bytes, status: int = 200, headers: dict | None = None):
+            self.send_response(status)
+            for name, value in (headers or {}).items():
+                self.send_header(name, value)
+            if status != 304:
+                self.send_header('Content-Type', 'text/html; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    server.article_revisions = article_revisions
+    return server
+
+
+def start_stub_server(**kwargs) -> tuple[ThreadingHTTPServer, str]:
+    server = create_stub_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f'http://{host}:{port}'
+
+
+if __name__ == '__main__':
+    server = create_stub_server(port=8766)
+    print('Serving stub BBC sport site on http://127.0.0.1:8766/sport')
+    server.serve_forever()
@@ -0,0 +1,141 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+from stub_site import start_stub_site
+
+
+def run_crawl(config: dict) -> dict:
+    # Runs in a fresh interpreter per configuration: the Twisted reactor can't be restarted
+    # and peak RSS must not carry over between runs.
+    os.environ.setdefault('SCRAPY_SETTINGS_MODULE', 'quotes_scraper.settings')
+    from scrapy.crawler import CrawlerProcess
+    from scrapy.utils.project import get_project_settings
+    from quotes_scraper.spiders.quotes import QuotesSpider
+
+    class BenchmarkQuotesSpider(QuotesSpider):
+        name = 'quotes_benchmark'
+        selector_cpu_time = 0.0
+
+        def parse(self, response, **kwargs):
+            results = super().parse(response, **kwargs)
+            while True:
+                start_time = time.thread_time()
+                try:
+                    result = next(results)
+                except StopIteration:
+                    return
+                finally:
+                    BenchmarkQuotesSpider.selector_cpu_time += time.thread_time() - start_time
+                yield result
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        settings = get_project_settings()
+        settings.setdict({
+            'LOG_LEVEL': 'WARNING',
+            'TELNETCONSOLE_ENABLED': False,
+            'QUOTES_DB_PATH': os.path.join(db_dir, 'quotes.db'),
+            'INSTRUMENTATION_EXPORT_PATH': os.path.join(db_dir, 'instrumentation.json'),
+            **config['settings'],
+        }, priority='cmdline')
+        process = CrawlerProcess(settings, install_root_handler=False)
+        crawler = process.create_crawler(BenchmarkQuotesSpider)
+        process.crawl(crawler, start_urls=config['start_urls'])
+        cpu_start_time = time.process_time()
+        process.start()
+        cpu_time = time.process_time() - cpu_start_time
+        instrumentation = {}
+        if os.path.exists(settings['INSTRUMENTATION_EXPORT_PATH']):
+            with open(settings['INSTRUMENTATION_EXPORT_PATH'], encoding='utf-8') as file:
+                instrumentation = json.load(file)['summary']
+
+    stats = crawler.stats.get_stats()
+    elapsed = (stats['finish_time'] - stats['start_time']).total_seconds()
+    items = stats.get('item_scraped_count', 0)
+    requests = stats.get('downloader/request_count', 0)
+    return {
+        'items': items,
+        'requests': requests,
+        'response_bytes': stats.get('downloader/response_bytes', 0),
+        'elapsed_seconds': elapsed,
+        'items_per_second': items / elapsed if elapsed else 0.0,
+        'requests_per_second': requests / elapsed if elapsed else 0.0,
+        'cpu_seconds': cpu_time,
+        'selector_cpu_seconds': BenchmarkQuotesSpider.selector_cpu_time,
+        # ru_maxrss is reported in kilobytes on Linux and in bytes on macOS
+        'peak_rss_bytes': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * (1 if sys.platform == 'darwin' else 1024),
+        'instrumentation': instrumentation,
+    }
+
+
+def run_crawl_in_subprocess(config: dict) -> dict:
+    completed = subprocess.run([sys.executable, __file__, '--child', json.dumps(config)],
+                               capture_output=True, text=True, check=True,
+                               cwd=os.path.dirname(os.path.abspath(__file__)))
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def parse_arguments() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description='Offline throughput benchmark for QuotesSpider')
+    parser.add_argument('--pages', type=int, default=200)
+    parser.add_argument('--quotes-per-page', type=int, default=10)
+    parser.add_argument('--words-per-quote', type=int, default=20)
+    parser.add_argument('--latency', type=float, default=0.0, help='server latency per request in seconds')
+    parser.add_argument('--concurrency', type=int, nargs='+', default=[16], help='CONCURRENT_REQUESTS values to run')
+    parser.add_argument('--repeat', type=int, default=1)
+    parser.add_argument('--label', default='')
+    parser.add_argument('--output', default='benchmark_results.json')
+    parser.add_argument('--child', help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == '__main__':
+    arguments = parse_arguments()
+    if arguments.child:
+        print(json.dumps(run_crawl(json.loads(arguments.child))))
+        sys.exit(0)
+
+    site = {
+        'pages': arguments.pages,
+        'quotes_per_page': arguments.quotes_per_page,
+        'words_per_quote': arguments.words_per_quote,
+        'latency': arguments.latency,
+    }
+    server, base_url = start_stub_site(page_count=arguments.pages, quotes_per_page=arguments.quotes_per_page,
+                                       words_per_quote=arguments.words_per_quote, latency=arguments.latency)
+    runs = []
+    try:
+        for concurrency in arguments.concurrency:
+            for repeat in range(arguments.repeat):
+                config = {
+                    'start_urls': [f'{base_url}/page/1/'],
+                    'settings': {'CONCURRENT_REQUESTS': concurrency, 'CONCURRENT_REQUESTS_PER_DOMAIN': concurrency},
+                }
+                metrics = run_crawl_in_subprocess(config)
+                runs.append({'settings': config['settings'], 'repeat': repeat, 'metrics': metrics})
+                print(f"concurrency={concurrency:<4} {metrics['items']} items, {metrics['requests']} requests in "
+                      f"{metrics['elapsed_seconds']:.2f}s: {metrics['items_per_second']:.0f} items/s, "
+                      f"{metrics['requests_per_second']:.0f} requests/s, "
+                      f"selector CPU {metrics['selector_cpu_seconds']:.2f}s, "
+                      f"peak RSS {metrics['peak_rss_bytes'] / 1024 / 1024:.0f} MiB")
+    finally:
+        server.shutdown()
+
+    results = {
+        'label': arguments.label,
+        'timestamp': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'site': site,
+        'runs': runs,
+    }
+    with open(arguments.output, 'w', encoding='utf-8') as file:
+        json.dump(results, file, indent=4)
+    print(f'Results written to {arguments.output}')
@@ -0,0 +1,51 @@
+import argparse
+import hashlib
+import time
+import tracemalloc
+
+from quotes_scraper.dupefilters import BloomFilter
+
+
+def fingerprints(start: int, count: int):
+    # Request fingerprints are 20-byte SHA1 digests, as produced by Scrapy's RequestFingerprinter
+    for i in range(start, start + count):
+        yield hashlib.sha1(f'https://quotes.example/page/{i}/'.encode('utf-8')).digest()
+
+
+def measure_set(count: int) -> int:
+    tracemalloc.start()
+    seen = set()
+    for fingerprint in fingerprints(0, count):
+        seen.add(fingerprint)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size
+
+
+def measure_bloom(count: int, error_rate: float) -> tuple[int, float, float]:
+    tracemalloc.start()
+    bloom = BloomFilter(count, error_rate)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    start_time = time.perf_counter()
+    for fingerprint in fingerprints(0, count):
+        bloom.add(fingerprint)
+    insert_time = time.perf_counter() - start_time
+    false_positives = sum(fingerprint in bloom for fingerprint in fingerprints(count, count))
+    return size, false_positives / count, count / insert_time
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Memory per seen URL: set of fingerprints vs Bloom filter')
+    parser.add_argument('--count', type=int, default=1_000_000)
+    parser.add_argument('--error-rates', type=float, nargs='+', default=[0.01, 0.001, 0.0001])
+    arguments = parser.parse_args()
+
+    set_size = measure_set(arguments.count)
+    print(f"set of fingerprints    {set_size / arguments.count:7.2f} bytes/URL")
+    for error_rate in arguments.error_rates:
+        bloom_size, observed_rate, inserts_per_second = measure_bloom(arguments.count, error_rate)
+        print(f"bloom p={error_rate:<11} {bloom_size / arguments.count:7.2f} bytes/URL "
+              f"({set_size / bloom_size:.0f}x smaller), observed false positive rate {observed_rate:.5f}, "
+              f"{inserts_per_second:,.0f} inserts/sec")
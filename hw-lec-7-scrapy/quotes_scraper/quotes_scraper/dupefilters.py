@@ -0,0 +1,143 @@
+# Compact request deduplication for large crawls
+#
+# Enable with the DUPEFILTER_CLASS setting, see:
+# https://docs.scrapy.org/en/latest/topics/settings.html#dupefilter-class
+
+import logging
+import math
+import os
+import struct
+import tempfile
+
+from scrapy.dupefilters import BaseDupeFilter
+from scrapy.utils.job import job_dir
+from scrapy.utils.request import referer_str
+
+# quotes.toscrape.com has a few hundred pages; about 180 KB of bits at the default error rate
+DEFAULT_CAPACITY = 100_000
+DEFAULT_ERROR_RATE = 0.001
+
+
+class BloomFilter:
+    HEADER = struct.Struct(">4sQIQ")
+    MAGIC = b"BLM1"
+
+    def __init__(self, capacity, error_rate):
+        self.size = max(8, math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, fingerprint):
+        # Double hashing over the request fingerprint, which is already a cryptographic digest
+        first = int.from_bytes(fingerprint[:8], "big")
+        second = int.from_bytes(fingerprint[8:16], "big") | 1
+        return [(first + i * second) % self.size for i in range(self.hash_count)]
+
+    def add(self, fingerprint):
+        # Returns True when the fingerprint was (probably) present already
+        present = True
+        for position in self._positions(fingerprint):
+            byte, mask = position >> 3, 1 << (position & 7)
+            if not self.bits[byte] & mask:
+                present = False
+                self.bits[byte] |= mask
+        if not present:
+            self.count += 1
+        return present
+
+    def __contains__(self, fingerprint):
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self._positions(fingerprint))
+
+    def save(self, path):
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+        try:
+            with os.fdopen(fd, "wb") as file:
+                file.write(self.HEADER.pack(self.MAGIC, self.size, self.hash_count, self.count))
+                file.write(self.bits)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self, path):
+        with open(path, "rb") as file:
+            magic, size, hash_count, count = self.HEADER.unpack(file.read(self.HEADER.size))
+            if magic != self.MAGIC:
+                raise ValueError(f"{path} is not a bloom filter file")
+            bits = bytearray(file.read())
+        if len(bits) != (size + 7) // 8:
+            raise ValueError(f"{path} is truncated")
+        self.size, self.hash_count, self.count, self.bits = size, hash_count, count, bits
+
+
+class BloomDupeFilter(BaseDupeFilter):
+    # Drop-in replacement for RFPDupeFilter that keeps seen fingerprints in a Bloom filter sized by
+    # DUPEFILTER_BLOOM_CAPACITY and DUPEFILTER_BLOOM_ERROR_RATE. The bits are allocated up front and
+    # every checkpoint rewrites them, so keep the capacity close to the expected crawl size. A false
+    # positive drops a request that was never crawled, so pick the error rate with the crawl size in
+    # mind. With JOBDIR set (or DUPEFILTER_BLOOM_PATH), the filter is checkpointed every
+    # DUPEFILTER_BLOOM_SAVE_EVERY new requests and on close, so crawls can resume.
+
+    def __init__(self, path=None, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE, save_every=10_000, debug=False,
+                 fingerprinter=None):
+        self.path = path
+        self.save_every = save_every
+        self.debug = debug
+        self.logdupes = True
+        self.logger = logging.getLogger(__name__)
+        self.fingerprinter = fingerprinter
+        self.bloom = BloomFilter(capacity, error_rate)
+        self.unsaved = 0
+        if self.path and os.path.exists(self.path):
+            self.bloom.load(self.path)
+            self.logger.info("Loaded %d seen requests from %s", self.bloom.count, self.path)
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        settings = crawler.settings
+        path = settings.get("DUPEFILTER_BLOOM_PATH")
+        if not path and job_dir(settings):
+            path = os.path.join(job_dir(settings), "requests.bloom")
+        return cls(
+            path=path,
+            capacity=settings.getint("DUPEFILTER_BLOOM_CAPACITY", DEFAULT_CAPACITY),
+            error_rate=settings.getfloat("DUPEFILTER_BLOOM_ERROR_RATE", DEFAULT_ERROR_RATE),
+            save_every=settings.getint("DUPEFILTER_BLOOM_SAVE_EVERY", 10_000),
+            debug=settings.getbool("DUPEFILTER_DEBUG"),
+            fingerprinter=crawler.request_fingerprinter,
+        )
+
+    def request_seen(self, request):
+        if self.bloom.add(self.fingerprinter.fingerprint(request)):
+            return True
+        self.unsaved += 1
+        if self.path and self.save_every and self.unsaved >= self.save_every:
+            self.save()
+        return False
+
+    def save(self):
+        self.bloom.save(self.path)
+        self.unsaved = 0
+
+    def close(self, reason):
+        if self.path and self.unsaved:
+            self.save()
+
+    def log(self, request, spider):
+        if self.debug:
+            msg = "Filtered duplicate request: %(request)s (referer: %(referer)s)"
+            args = {"request": request, "referer": referer_str(request)}
+            self.logger.debug(msg, args, extra={"spider": spider})
+        elif self.logdupes:
+            msg = (
+                "Filtered duplicate request: %(request)s"
+                " - no more duplicates will be shown"
+                " (see DUPEFILTER_DEBUG to show all duplicates)"
+            )
+            self.logger.debug(msg, {"request": request}, extra={"spider": spider})
+            self.logdupes = False
+
+        spider.crawler.stats.inc_value("dupefilter/filtered")
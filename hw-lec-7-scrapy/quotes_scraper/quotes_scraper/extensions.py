@@ -0,0 +1,191 @@
+# Crawl instrumentation: tells network-bound crawls apart from parser-bound ones
+#
+# See documentation in:
+# https://docs.scrapy.org/en/latest/topics/extensions.html
+
+import bisect
+import functools
+import json
+import logging
+import time
+from collections import defaultdict
+from urllib.parse import urlparse
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+from twisted.internet import task
+
+logger = logging.getLogger(__name__)
+
+SCHEDULED_AT_META_KEY = "_instrumentation_scheduled_at"
+
+
+class Histogram:
+    # Fixed log-scale buckets in milliseconds, cheap enough to update for every request
+    BOUNDS_MS = [1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 10000, 30000, 60000]
+
+    def __init__(self):
+        self.buckets = [0] * (len(self.BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, seconds):
+        value_ms = seconds * 1000
+        self.buckets[bisect.bisect_left(self.BOUNDS_MS, value_ms)] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.max_ms = max(self.max_ms, value_ms)
+
+    def percentile(self, fraction):
+        # Upper bound of the bucket holding the requested rank
+        if not self.count:
+            return 0.0
+        rank = fraction * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.buckets):
+            seen += bucket_count
+            if seen >= rank:
+                return float(self.BOUNDS_MS[index]) if index < len(self.BOUNDS_MS) else self.max_ms
+        return self.max_ms
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": round(self.total_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": {
+                f"le_{bound}": count for bound, count in zip(self.BOUNDS_MS + ["inf"], self.buckets) if count
+            },
+        }
+
+
+class CrawlInstrumentation:
+    # Collects download latency per host, scheduler queue wait, and CPU time per spider callback and
+    # per pipeline stage. Every INSTRUMENTATION_INTERVAL seconds a snapshot is logged and mirrored into
+    # the crawl stats; the full data is exported as JSON to INSTRUMENTATION_EXPORT_PATH on close.
+
+    def __init__(self, stats, interval, export_path):
+        self.stats = stats
+        self.interval = interval
+        self.export_path = export_path
+        self.download_latency = defaultdict(Histogram)
+        self.queue_wait = Histogram()
+        self.callback_cpu = defaultdict(Histogram)
+        self.pipeline_cpu = defaultdict(Histogram)
+        self.snapshots = []
+        self.started_at = None
+        self.snapshot_loop = None
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("INSTRUMENTATION_ENABLED", True):
+            raise NotConfigured
+        extension = cls(
+            stats=crawler.stats,
+            interval=crawler.settings.getfloat("INSTRUMENTATION_INTERVAL", 60.0),
+            export_path=crawler.settings.get("INSTRUMENTATION_EXPORT_PATH", "instrumentation.json"),
+        )
+        crawler.signals.connect(extension.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(extension.spider_closed, signal=signals.spider_closed)
+        crawler.signals.connect(extension.request_scheduled, signal=signals.request_scheduled)
+        crawler.signals.connect(extension.request_reached_downloader, signal=signals.request_reached_downloader)
+        crawler.signals.connect(extension.response_received, signal=signals.response_received)
+        return extension
+
+    @classmethod
+    def of(cls, crawler):
+        # Middlewares and pipelines record into the extension instance loaded by this crawler
+        for extension in crawler.extensions.middlewares:
+            if isinstance(extension, cls):
+                return extension
+        return None
+
+    def spider_opened(self, spider):
+        self.started_at = time.monotonic()
+        if self.interval > 0:
+            self.snapshot_loop = task.LoopingCall(self.take_snapshot, spider)
+            self.snapshot_loop.start(self.interval, now=False)
+
+    def spider_closed(self, spider, reason):
+        if self.snapshot_loop is not None and self.snapshot_loop.running:
+            self.snapshot_loop.stop()
+        self.take_snapshot(spider)
+        if self.export_path:
+            with open(self.export_path, "w", encoding="utf-8") as file:
+                json.dump(self.export(reason), file, indent=4)
+            logger.info("Instrumentation exported to %s", self.export_path, extra={"spider": spider})
+
+    def request_scheduled(self, request, spider):
+        request.meta[SCHEDULED_AT_META_KEY] = time.monotonic()
+
+    def request_reached_downloader(self, request, spider):
+        scheduled_at = request.meta.pop(SCHEDULED_AT_META_KEY, None)
+        if scheduled_at is not None:
+            self.queue_wait.add(time.monotonic() - scheduled_at)
+
+    def response_received(self, response, request, spider):
+        latency = request.meta.get("download_latency")
+        if latency is not None:
+            self.download_latency[urlparse(request.url).netloc].add(latency)
+
+    def record_callback(self, name, seconds):
+        self.callback_cpu[name].add(seconds)
+
+    def record_pipeline_stage(self, name, seconds):
+        self.pipeline_cpu[name].add(seconds)
+
+    def summary(self):
+        download_ms = sum(histogram.total_ms for histogram in self.download_latency.values())
+        callback_ms = sum(histogram.total_ms for histogram in self.callback_cpu.values())
+        pipeline_ms = sum(histogram.total_ms for histogram in self.pipeline_cpu.values())
+        return {
+            "elapsed_seconds": round(time.monotonic() - self.started_at, 3) if self.started_at else 0.0,
+            "download_latency_total_ms": round(download_ms, 3),
+            "queue_wait_total_ms": round(self.queue_wait.total_ms, 3),
+            "callback_cpu_total_ms": round(callback_ms, 3),
+            "pipeline_cpu_total_ms": round(pipeline_ms, 3),
+        }
+
+    def take_snapshot(self, spider):
+        snapshot = {
+            **self.summary(),
+            "download_latency_p95_ms": {host: h.percentile(0.95) for host, h in self.download_latency.items()},
+            "queue_wait_p95_ms": self.queue_wait.percentile(0.95),
+            "callback_cpu_p95_ms": {name: h.percentile(0.95) for name, h in self.callback_cpu.items()},
+            "pipeline_cpu_p95_ms": {name: h.percentile(0.95) for name, h in self.pipeline_cpu.items()},
+        }
+        self.snapshots.append(snapshot)
+        for key, value in self.summary().items():
+            self.stats.set_value(f"instrumentation/{key}", value)
+        logger.info("Instrumentation snapshot: %s", json.dumps(snapshot), extra={"spider": spider})
+
+    def export(self, reason):
+        return {
+            "reason": reason,
+            "summary": self.summary(),
+            "download_latency": {host: h.to_dict() for host, h in self.download_latency.items()},
+            "queue_wait": self.queue_wait.to_dict(),
+            "callback_cpu": {name: h.to_dict() for name, h in self.callback_cpu.items()},
+            "pipeline_cpu": {name: h.to_dict() for name, h in self.pipeline_cpu.items()},
+            "snapshots": self.snapshots,
+        }
+
+
+def timed_pipeline_stage(process_item):
+    # Decorates an item pipeline's process_item so its CPU time is recorded per pipeline class
+    @functools.wraps(process_item)
+    def wrapper(self, item, spider):
+        start_time = time.thread_time()
+        try:
+            return process_item(self, item, spider)
+        finally:
+            instrumentation = CrawlInstrumentation.of(spider.crawler)
+            if instrumentation is not None:
+                instrumentation.record_pipeline_stage(type(self).__name__, time.thread_time() - start_time)
+
+    return wrapper
@@ -7,6 +7,14 @@ import scrapy
 
 
 class QuotesScraperItem(scrapy.Item):
-    # define the fields for your item here like:
-    # name = scrapy.Field()
-    pass
+    text = scrapy.Field()
+    author = scrapy.Field()
+    tags = scrapy.Field()
+    url = scrapy.Field()
+
+
+class AuthorItem(scrapy.Item):
+    name = scrapy.Field()
+    born_date = scrapy.Field()
+    description = scrapy.Field()
+    url = scrapy.Field()
@@ -3,11 +3,15 @@
 # See documentation in:
 # https://docs.scrapy.org/en/latest/topics/spider-middleware.html
 
+import time
+
 from scrapy import signals
 
 # useful for handling different item types with a single interface
 from itemadapter import is_item, ItemAdapter
 
+from quotes_scraper.extensions import CrawlInstrumentation
+
 
 class QuotesScraperSpiderMiddleware:
     # Not all methods need to be defined. If a method is not defined,
@@ -101,3 +105,64 @@ class QuotesScraperDownloaderMiddleware:
 
     def spider_opened(self, spider):
         spider.logger.info("Spider opened: %s" % spider.name)
+
+
+class CallbackTimingSpiderMiddleware:
+    # Records the CPU time spent inside each spider callback into CrawlInstrumentation.
+    # Callbacks are generators, so the time is summed over every step of their output.
+    # Keep it closest to the spider (highest order) so other middlewares are not counted.
+
+    def __init__(self, crawler):
+        self.crawler = crawler
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler)
+
+    def process_spider_output(self, response, result, spider):
+        instrumentation = CrawlInstrumentation.of(self.crawler)
+        if instrumentation is None:
+            yield from result
+            return
+
+        iterator = iter(result)
+        cpu_time = 0.0
+        try:
+            while True:
+                start_time = time.thread_time()
+                try:
+                    output = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    cpu_time += time.thread_time() - start_time
+                yield output
+        finally:
+            instrumentation.record_callback(self.callback_name(response), cpu_time)
+
+    async def process_spider_output_async(self, response, result, spider):
+        instrumentation = CrawlInstrumentation.of(self.crawler)
+        if instrumentation is None:
+            async for output in result:
+                yield output
+            return
+
+        iterator = result.__aiter__()
+        cpu_time = 0.0
+        try:
+            while True:
+                start_time = time.thread_time()
+                try:
+                    output = await iterator.__anext__()
+                except StopAsyncIteration:
+                    return
+                finally:
+                    cpu_time += time.thread_time() - start_time
+                yield output
+        finally:
+            instrumentation.record_callback(self.callback_name(response), cpu_time)
+
+    @staticmethod
+    def callback_name(response):
+        callback = response.request.callback if response.request is not None else None
+        return getattr(callback, "__name__", "parse")
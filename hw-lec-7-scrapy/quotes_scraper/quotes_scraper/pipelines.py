@@ -3,11 +3,95 @@
 # Don't forget to add your pipeline to the ITEM_PIPELINES setting
 # See: https://docs.scrapy.org/en/latest/topics/item-pipeline.html
 
+import hashlib
+import json
+import sqlite3
+import time
+
+from twisted.internet import task
 
 # useful for handling different item types with a single interface
 from itemadapter import ItemAdapter
 
+from quotes_scraper.extensions import timed_pipeline_stage
+from quotes_scraper.items import QuotesScraperItem
+
 
 class QuotesScraperPipeline:
+    # Buffers quotes and writes them in one transaction per batch. A batch is flushed once it
+    # reaches QUOTES_DB_BATCH_SIZE items, every QUOTES_DB_FLUSH_INTERVAL seconds, and on close.
+    # Duplicate quotes are dropped by the unique index on content_hash.
+
+    def __init__(self, db_path, batch_size, flush_interval):
+        self.db_path = db_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.buffer = []
+        self.connection = None
+        self.flush_loop = None
+        self.last_flush_time = time.monotonic()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(
+            db_path=crawler.settings.get("QUOTES_DB_PATH", "quotes.db"),
+            batch_size=crawler.settings.getint("QUOTES_DB_BATCH_SIZE", 500),
+            flush_interval=crawler.settings.getfloat("QUOTES_DB_FLUSH_INTERVAL", 5.0),
+        )
+
+    def open_spider(self, spider):
+        self.connection = sqlite3.connect(self.db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(
+            "CREATE TABLE IF NOT EXISTS quotes ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "content_hash TEXT NOT NULL, "
+            "text TEXT, "
+            "author TEXT, "
+            "tags TEXT, "
+            "url TEXT)"
+        )
+        self.connection.execute("CREATE UNIQUE INDEX IF NOT EXISTS ix_quotes_content_hash ON quotes (content_hash)")
+        self.connection.commit()
+        if self.flush_interval > 0:
+            self.flush_loop = task.LoopingCall(self.flush_if_due, spider)
+            self.flush_loop.start(self.flush_interval, now=False)
+
+    def close_spider(self, spider):
+        if self.flush_loop is not None and self.flush_loop.running:
+            self.flush_loop.stop()
+        self.flush(spider)
+        self.connection.close()
+
+    @timed_pipeline_stage
     def process_item(self, item, spider):
+        if not isinstance(item, QuotesScraperItem):
+            return item
+        adapter = ItemAdapter(item)
+        text = adapter.get("text") or ""
+        author = adapter.get("author") or ""
+        content_hash = hashlib.sha1(f"{author}\x1f{text}".encode("utf-8")).hexdigest()
+        self.buffer.append((content_hash, text, author, json.dumps(adapter.get("tags") or [], ensure_ascii=False),
+                            adapter.get("url")))
+        if len(self.buffer) >= self.batch_size:
+            self.flush(spider)
         return item
+
+    def flush_if_due(self, spider):
+        if time.monotonic() - self.last_flush_time >= self.flush_interval:
+            self.flush(spider)
+
+    def flush(self, spider):
+        self.last_flush_time = time.monotonic()
+        if not self.buffer:
+            return
+        batch, self.buffer = self.buffer, []
+        with self.connection:
+            cursor = self.connection.executemany(
+                "INSERT OR IGNORE INTO quotes (content_hash, text, author, tags, url) VALUES (?, ?, ?, ?, ?)", batch
+            )
+        spider.crawler.stats.inc_value("quotes_db/items_buffered", len(batch))
+        spider.crawler.stats.inc_value("quotes_db/items_inserted", cursor.rowcount)
+        spider.crawler.stats.inc_value("quotes_db/flushes")
+        spider.logger.debug("Flushed %d quotes to %s (%d new)", len(batch), self.db_path, cursor.rowcount)
@@ -44,9 +44,9 @@ ROBOTSTXT_OBEY = True
 
 # Enable or disable spider middlewares
 # See https://docs.scrapy.org/en/latest/topics/spider-middleware.html
-#SPIDER_MIDDLEWARES = {
-#    "quotes_scraper.middlewares.QuotesScraperSpiderMiddleware": 543,
-#}
+SPIDER_MIDDLEWARES = {
+    "quotes_scraper.middlewares.CallbackTimingSpiderMiddleware": 1000,
+}
 
 # Enable or disable downloader middlewares
 # See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html
@@ -56,15 +56,32 @@ ROBOTSTXT_OBEY = True
 
 # Enable or disable extensions
 # See https://docs.scrapy.org/en/latest/topics/extensions.html
-#EXTENSIONS = {
-#    "scrapy.extensions.telnet.TelnetConsole": None,
-#}
+EXTENSIONS = {
+    "quotes_scraper.extensions.CrawlInstrumentation": 500,
+}
+
+# Latency and CPU instrumentation (see quotes_scraper.extensions.CrawlInstrumentation)
+INSTRUMENTATION_ENABLED = True
+INSTRUMENTATION_INTERVAL = 60.0
+INSTRUMENTATION_EXPORT_PATH = "instrumentation.json"
 
 # Configure item pipelines
 # See https://docs.scrapy.org/en/latest/topics/item-pipeline.html
-#ITEM_PIPELINES = {
-#    "quotes_scraper.pipelines.QuotesScraperPipeline": 300,
-#}
+ITEM_PIPELINES = {
+    "quotes_scraper.pipelines.QuotesScraperPipeline": 300,
+}
+
+# Batched SQLite persistence of quotes (see QuotesScraperPipeline)
+QUOTES_DB_PATH = "quotes.db"
+QUOTES_DB_BATCH_SIZE = 500
+QUOTES_DB_FLUSH_INTERVAL = 5.0
+
+# Keep seen request fingerprints in a Bloom filter instead of an in-memory set
+# (see quotes_scraper.dupefilters.BloomDupeFilter). With JOBDIR set it is persisted for resuming.
+DUPEFILTER_CLASS = "quotes_scraper.dupefilters.BloomDupeFilter"
+# Sized for this site, raise it for larger crawls (bits are allocated up front and rewritten on each save)
+DUPEFILTER_BLOOM_CAPACITY = 100_000
+DUPEFILTER_BLOOM_ERROR_RATE = 0.001
 
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
@@ -1,16 +1,31 @@
 import scrapy
 
+from quotes_scraper.items import AuthorItem, QuotesScraperItem
+
 
 class QuotesSpider(scrapy.Spider):
     name = "quotes"
     start_urls = [
         'https://quotes.toscrape.com/page/1/',
-        'https://quotes.toscrape.com/page/2/',
     ]
 
     def parse(self, response):
         for quote in response.css('div.quote'):
-            yield {
-                'text': quote.css('span.text::text').get(),
-                'author': quote.css('small.author::text').get(),
-            }
\ No newline at end of file
+            yield QuotesScraperItem(
+                text=quote.css('span.text::text').get(),
+                author=quote.css('small.author::text').get(),
+                tags=quote.css('div.tags a.tag::text').getall(),
+                url=response.url,
+            )
+
+        # Author pages repeat across quotes, the dupefilter drops the ones already requested
+        yield from response.follow_all(css='.author + a', callback=self.parse_author)
+        yield from response.follow_all(css='li.next a', callback=self.parse)
+
+    def parse_author(self, response):
+        yield AuthorItem(
+            name=response.css('h3.author-title::text').get(default='').strip(),
+            born_date=response.css('span.author-born-date::text').get(),
+            description=response.css('div.author-description::text').get(default='').strip(),
+            url=response.url,
+        )
@@ -0,0 +1,97 @@
+import html
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+AUTHORS = ['Albert Einstein', 'J.K. Rowling', 'Jane Austen', 'Marilyn Monroe', 'André Gide', 'Thomas A. Edison',
+           'Eleanor Roosevelt', 'Steve Martin', 'Mark Twain', 'Dr. Seuss']
+TAGS = ['change', 'deep-thoughts', 'thinking', 'world', 'abilities', 'choices', 'inspirational', 'life', 'love',
+        'humor', 'books', 'friendship', 'truth', 'simile']
+WORDS = ['the', 'world', 'as', 'we', 'have', 'created', 'it', 'is', 'a', 'process', 'of', 'our', 'thinking',
+         'cannot', 'be', 'changed', 'without', 'changing', 'choices', 'that', 'show', 'what', 'truly', 'are']
+
+
+def author_slug(author: str) -> str:
+    return author.replace('.', '').replace(' ', '-')
+
+
+def render_quote(rng: random.Random, words_per_quote: int) -> str:
+    author = rng.choice(AUTHORS)
+    text = ' '.join(rng.choice(WORDS) for _ in range(words_per_quote)).capitalize() + '.'
+    tags = ''.join(f'<a class="tag" href="/tag/{tag}/page/1/">{tag}</a>\n' for tag in rng.sample(TAGS, 3))
+    return f'''<div class="quote" itemscope itemtype="http://schema.org/CreativeWork">
+    <span class="text" itemprop="text">“{html.escape(text)}”</span>
+    <span>by <small class="author" itemprop="author">{html.escape(author)}</small>
+    <a href="/author/{author_slug(author)}">(about)</a></span>
+    <div class="tags">Tags: {tags}</div>
+</div>
+'''
+
+
+def render_page(page: int, page_count: int, quotes_per_page: int, words_per_quote: int) -> str:
+    rng = random.Random(page)
+    quotes = ''.join(render_quote(rng, words_per_quote) for _ in range(quotes_per_page))
+    pager = ''
+    if page > 1:
+        pager += f'<li class="previous"><a href="/page/{page - 1}/">Previous</a></li>'
+    if page < page_count:
+        pager += f'<li class="next"><a href="/page/{page + 1}/">Next</a></li>'
+    return (f'<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"><title>Quotes to Scrape</title></head>'
+            f'<body><div class="container"><div class="row"><div class="col-md-8">{quotes}'
+            f'<nav><ul class="pager">{pager}</ul></nav></div></div></div></body></html>')
+
+
+def render_author_page(slug: str) -> str:
+    name = slug.replace('-', ' ')
+    return (f'<html><body><div class="author-details"><h3 class="author-title">{html.escape(name)}</h3>'
+            f'<span class="author-born-date">March 14, 1879</span>'
+            f'<div class="author-description">{"Lorem ipsum " * 50}</div></div></body></html>')
+
+
+def create_stub_site(page_count: int = 100, quotes_per_page: int = 10, words_per_quote: int = 20,
+                     latency: float = 0.0, port: int = 0) -> ThreadingHTTPServer:
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            if latency:
+                time.sleep(latency)
+            parts = [part for part in self.path.split('/') if part]
+            if parts == ['robots.txt']:
+                self.send_body(b'User-agent: *\nAllow: /\n', 'text/plain')
+            elif len(parts) == 2 and parts[0] == 'page' and parts[1].isdigit() and 1 <= int(parts[1]) <= page_count:
+                page = int(parts[1])
+                self.send_body(render_page(page, page_count, quotes_per_page, words_per_quote).encode('utf-8'))
+            elif len(parts) == 2 and parts[0] == 'author':
+                self.send_body(render_author_page(parts[1]).encode('utf-8'))
+            else:
+                self.send_body(b'Not found', status=404)
+
+        def send_body(self, body: bytes, content_type: str = 'text/html; charset=utf-8', status: int = 200):
+            self.send_response(status)
+            self.send_header('Content-Type', content_type)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    return server
+
+
+def start_stub_site(**kwargs) -> tuple[ThreadingHTTPServer, str]:
+    server = create_stub_site(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f'http://{host}:{port}'
+
+
+if __name__ == '__main__':
+    server = create_stub_site(port=8767)
+    print('Serving stub quotes site on http://127.0.0.1:8767/page/1/')
+    server.serve_forever()
@@ -0,0 +1,49 @@
+import html
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from main import extract_jobs_element_by_element, extract_jobs_with_script, prepare_driver
+
+JOBS_PER_PAGE = 20
+ROUNDS = 10
+
+
+def render_fixture_page(job_count: int) -> str:
+    # Mirrors the ais-Hits markup of the M&S job search result list
+    items = ''.join(f'''
+        <li class="ais-Hits-item">
+            <article class="job-card">
+                <h3>{html.escape(f"Customer Assistant {i} - Store {i % 40}")}</h3>
+                <p>London, United Kingdom</p>
+                <a data-track-trigger="job_listing_link" href="/job-search/jobs/{100000 + i}">View job</a>
+            </article>
+        </li>''' for i in range(job_count))
+    return f'<!DOCTYPE html><html><body><div class="ais-Hits"><ol class="ais-Hits-list">{items}</ol></div></body></html>'
+
+
+def measure(label: str, extract, driver) -> list[dict]:
+    start_time = time.perf_counter()
+    for _ in range(ROUNDS):
+        jobs = extract(driver)
+    execution_time = (time.perf_counter() - start_time) / ROUNDS
+    print(f"### {label}: {len(jobs)} jobs, {execution_time * 1000:.1f} ms per page on average")
+    return jobs
+
+
+if __name__ == '__main__':
+    job_count = int(sys.argv[1]) if len(sys.argv) > 1 else JOBS_PER_PAGE
+    with tempfile.TemporaryDirectory() as fixture_dir:
+        fixture_path = Path(fixture_dir) / 'job-search.html'
+        fixture_path.write_text(render_fixture_page(job_count), encoding='utf-8')
+
+        driver = prepare_driver()
+        try:
+            driver.get(fixture_path.as_uri())
+            expected = measure('element by element', extract_jobs_element_by_element, driver)
+            jobs = measure('single script call', extract_jobs_with_script, driver)
+            if jobs != expected:
+                raise AssertionError("Script extraction returned different jobs than element extraction")
+        finally:
+            driver.quit()
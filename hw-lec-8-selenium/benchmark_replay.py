@@ -0,0 +1,57 @@
+import json
+import sys
+import time
+
+from search_replay import SEARCH_REQUEST_PATH, find_search_request, parse_jobs, replay_search, to_captured_request
+from stub_search_server import API_KEY, APPLICATION_ID, INDEX_NAME, render_result, start_stub_server
+from tracing import TRACER
+
+JOB_COUNT = 400
+HITS_PER_PAGE = 20
+WORKER_COUNTS = [1, 4, 8, 16]
+
+
+def build_performance_log(base_url: str) -> list[dict]:
+    # The entries Chrome writes to the performance log while InstantSearch renders the first page
+    search_request = {
+        'url': (f'{base_url}{SEARCH_REQUEST_PATH}?x-algolia-agent=Algolia%20for%20JavaScript'
+                f'&x-algolia-api-key={API_KEY}&x-algolia-application-id={APPLICATION_ID}'),
+        'method': 'POST',
+        'headers': {'Accept': '*/*', 'Content-Type': 'application/x-www-form-urlencoded', 'Host': 'stub'},
+        'postData': json.dumps({'requests': [{
+            'indexName': INDEX_NAME,
+            'params': f'facets=%5B%22location%22%5D&hitsPerPage={HITS_PER_PAGE}&page=0&query=',
+        }]}),
+    }
+    messages = [
+        {'method': 'Network.requestWillBeSent',
+         'params': {'requestId': '1.1', 'request': {'url': f'{base_url}/job-search', 'method': 'GET', 'headers': {}}}},
+        {'method': 'Network.requestWillBeSent', 'params': {'requestId': '1.7', 'request': search_request}},
+        {'method': 'Network.responseReceived', 'params': {'requestId': '1.7'}},
+    ]
+    return [{'message': json.dumps({'message': message, 'webview': 'stub'}), 'level': 'INFO'} for message in messages]
+
+
+if __name__ == '__main__':
+    job_count = int(sys.argv[1]) if len(sys.argv) > 1 else JOB_COUNT
+    TRACER.verbose = False
+    server, base_url = start_stub_server(job_count=job_count)
+    try:
+        _, request = find_search_request(build_performance_log(base_url))
+        search_request = to_captured_request(request, request['postData'])
+        page_count = (job_count + HITS_PER_PAGE - 1) // HITS_PER_PAGE
+        expected = []
+        for page in range(page_count):
+            expected += parse_jobs(render_result(job_count, page, HITS_PER_PAGE))
+
+        for max_workers in WORKER_COUNTS:
+            start_time = time.perf_counter()
+            jobs = replay_search(search_request, max_workers=max_workers)
+            execution_time = time.perf_counter() - start_time
+            if jobs != expected:
+                raise AssertionError(f"Replay with {max_workers} workers returned different jobs")
+            print(f"### {max_workers:>2} workers: {len(jobs)} jobs from {page_count} pages in {execution_time:.2f}s, "
+                  f"{page_count / execution_time:.1f} pages/s")
+        print(json.dumps(jobs[:2], indent=4))
+    finally:
+        server.shutdown()
@@ -1,8 +1,8 @@
 import json
-import time
 
+import requests
 from selenium import webdriver
-from selenium.common import StaleElementReferenceException
+from selenium.common import StaleElementReferenceException, WebDriverException
 from selenium.webdriver.chromium.webdriver import ChromiumDriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.chrome.service import Service
@@ -11,27 +11,64 @@ from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.wait import WebDriverWait
 
+from search_replay import ROOT_URL, capture_search_request, replay_search
+from tracing import TRACER, traced
+
+PAGE_COUNT = 2
+# Uses the browser for the first page only and fetches the rest from the captured search endpoint
+REPLAY_MODE = True
+TRACE_FILE_PATH = 'trace.json'
+PROFILE_FILE_PATH = 'profile.folded'
+# Samples Python stacks in the background, for time spent outside of traced functions
+ENABLE_SAMPLING_PROFILER = False
+
+JOB_ITEMS_XPATH = '//li[@class="ais-Hits-item"]'
+JOB_LINK_XPATH = ".//a[@data-track-trigger='job_listing_link']"
+
+# Collects every job card in a single WebDriver round trip, using the same XPaths as the element path
+EXTRACT_JOBS_SCRIPT = """
+const items = document.evaluate(arguments[0], document, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+const jobs = [];
+for (let i = 0; i < items.snapshotLength; i++) {
+    const item = items.snapshotItem(i);
+    const title = document.evaluate('.//h3', item, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    const link = document.evaluate(arguments[1], item, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+    jobs.push({
+        title: title ? title.innerText.trim() : null,
+        url: link ? link.href : null
+    });
+}
+return JSON.stringify(jobs);
+"""
+
+
+@traced
+def extract_jobs_from_current_page(driver):
+    try:
+        jobs = extract_jobs_with_script(driver)
+    except WebDriverException as e:
+        print(f"Script extraction failed, falling back to element extraction: {e.msg}")
+        return extract_jobs_element_by_element(driver)
+    if any(job["title"] is None or job["url"] is None for job in jobs):
+        print("Script extraction returned incomplete jobs, falling back to element extraction")
+        return extract_jobs_element_by_element(driver)
+    return jobs
 
-def time_logger(func):
-    def wrapper(*args, **kwargs):
-        start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        execution_time = end_time - start_time
-        print(f"Function {func.__name__} executed in {execution_time:.4f} seconds")
-        return result
 
-    return wrapper
+@traced
+def extract_jobs_with_script(driver):
+    print("Extracting jobs from page with a single script call")
+    return json.loads(driver.execute_script(EXTRACT_JOBS_SCRIPT, JOB_ITEMS_XPATH, JOB_LINK_XPATH))
 
 
-@time_logger
-def extract_jobs_from_current_page(driver):
+@traced
+def extract_jobs_element_by_element(driver):
     print("Extracting jobs from page")
     jobs = []
-    job_elements = driver.find_elements(By.XPATH, '//li[@class="ais-Hits-item"]')
+    job_elements = driver.find_elements(By.XPATH, JOB_ITEMS_XPATH)
     for job_element in job_elements:
         title = job_element.find_element(By.XPATH, './/h3').text
-        url = job_element.find_element(By.XPATH, ".//a[@data-track-trigger='job_listing_link']").get_attribute('href')
+        url = job_element.find_element(By.XPATH, JOB_LINK_XPATH).get_attribute('href')
         jobs.append({
             "title": title,
             "url": url
@@ -39,16 +76,15 @@ def extract_jobs_from_current_page(driver):
     return jobs
 
 
-@time_logger
+@traced
 def navigate_to_root(driver):
     print("Navigating to root url")
     current_url = driver.current_url
-    root_url = 'https://jobs.marksandspencer.com/job-search'
-    driver.get(root_url)
+    driver.get(ROOT_URL)
     wait_for_page_load(driver, current_url)
 
 
-@time_logger
+@traced
 def navigate_to_next_page(driver):
     print("Navigating to next page")
     current_url = driver.current_url
@@ -57,26 +93,63 @@ def navigate_to_next_page(driver):
     wait_for_page_load(driver, current_url)
 
 
-@time_logger
+@traced
 def wait_for_page_load(driver, url_before_action):
     print("Waiting for page to load")
     wait = WebDriverWait(driver, 10)
 
-    @time_logger
+    @traced
     def wait_for_url_to_change():
         wait.until(EC.url_changes(url_before_action))
 
-    @time_logger
+    @traced
     def wait_for_elements_to_appear():
-        wait.until(EC.presence_of_all_elements_located((By.XPATH, '//li[@class="ais-Hits-item"]')))
+        wait.until(EC.presence_of_all_elements_located((By.XPATH, JOB_ITEMS_XPATH)))
 
     wait_for_url_to_change()
     wait_for_elements_to_appear()
 
 
-def prepare_driver() -> ChromiumDriver:
+def scrape_next_pages_with_browser(driver, page_count: int) -> list[dict]:
+    jobs = []
+    for _ in range(page_count - 1):
+        navigate_to_next_page(driver)
+        jobs += extract_jobs_from_current_page(driver)
+    return jobs
+
+
+@traced
+def scrape_with_browser(driver, page_count: int) -> list[dict]:
+    navigate_to_root(driver)
+    return extract_jobs_from_current_page(driver) + scrape_next_pages_with_browser(driver, page_count)
+
+
+@traced
+def scrape_with_replay(driver, page_count: int) -> list[dict]:
+    navigate_to_root(driver)
+    first_page_jobs = extract_jobs_from_current_page(driver)
+    try:
+        search_request = capture_search_request(driver)
+        jobs = replay_search(search_request, page_count) if search_request is not None else None
+    except (WebDriverException, requests.RequestException, KeyError, ValueError) as e:
+        # Post data Chrome no longer holds, HTTP errors, a request or response shape other than the expected one,
+        # or a body that is not JSON
+        print(f"Capturing or replaying the search request failed ({e!r}), falling back to browser navigation")
+        return first_page_jobs + scrape_next_pages_with_browser(driver, page_count)
+    if jobs is None:
+        print("Search request was not captured, falling back to browser navigation")
+        return first_page_jobs + scrape_next_pages_with_browser(driver, page_count)
+    if jobs[:len(first_page_jobs)] != first_page_jobs:
+        print("Replayed jobs differ from the rendered page, falling back to browser navigation")
+        return first_page_jobs + scrape_next_pages_with_browser(driver, page_count)
+    return jobs
+
+
+def prepare_driver(capture_network: bool = False) -> ChromiumDriver:
     chrome_options = Options()
     chrome_options.add_argument("--headless")
+    if capture_network:
+        chrome_options.set_capability('goog:loggingPrefs', {'performance': 'ALL'})
     user_agent = ("Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) "
                   "Chrome/126.0.0.0 Safari/537.36")
     chrome_options.add_argument(f'user-agent={user_agent}')
@@ -85,18 +158,26 @@ def prepare_driver() -> ChromiumDriver:
 
 
 if __name__ == '__main__':
-    driver = prepare_driver()
-    jobs = []
+    if ENABLE_SAMPLING_PROFILER:
+        TRACER.start_profiler()
+    driver = prepare_driver(capture_network=REPLAY_MODE)
     try:
-        navigate_to_root(driver)
-        jobs += extract_jobs_from_current_page(driver)
-        navigate_to_next_page(driver)
-        jobs += extract_jobs_from_current_page(driver)
+        if REPLAY_MODE:
+            jobs = scrape_with_replay(driver, PAGE_COUNT)
+        else:
+            jobs = scrape_with_browser(driver, PAGE_COUNT)
     except StaleElementReferenceException:
         # print(driver.page_source)
         raise
     finally:
         driver.quit()
+        TRACER.stop_profiler()
+        TRACER.print_summary()
+        TRACER.export_trace(TRACE_FILE_PATH)
+        print(f"Trace written to {TRACE_FILE_PATH}")
+        if TRACER.profiler is not None:
+            TRACER.profiler.export_collapsed(PROFILE_FILE_PATH)
+            print(f"Sampled stacks written to {PROFILE_FILE_PATH}")
 
     with open('jobs.json', 'w') as file:
         json.dump(jobs, file, indent=4)
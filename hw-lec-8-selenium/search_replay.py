@@ -0,0 +1,115 @@
+import copy
+import json
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl, urlencode, urljoin
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from tracing import traced
+
+ROOT_URL = 'https://jobs.marksandspencer.com/job-search'
+# InstantSearch sends every result list refresh as an Algolia multi-query POST
+SEARCH_REQUEST_PATH = '/1/indexes/*/queries'
+HIT_TITLE_FIELD = 'title'
+HIT_URL_FIELD = 'url'
+# Headers Chrome reports that must not be replayed verbatim
+SKIPPED_HEADERS = {'host', 'content-length', 'connection', 'accept-encoding', 'cookie'}
+MAX_WORKERS = 8
+
+
+class CapturedSearchRequest:
+
+    def __init__(self, url: str, headers: dict[str, str], body: dict):
+        self.url = url
+        self.headers = headers
+        self.body = body
+
+
+def find_search_request(performance_log: list[dict]) -> tuple[str, dict] | None:
+    # Returns the request id and request of the last search XHR in Chrome's performance log
+    found = None
+    for entry in performance_log:
+        message = json.loads(entry['message'])['message']
+        if message['method'] != 'Network.requestWillBeSent':
+            continue
+        request = message['params']['request']
+        if request['method'] == 'POST' and SEARCH_REQUEST_PATH in request['url']:
+            found = (message['params']['requestId'], request)
+    return found
+
+
+@traced
+def capture_search_request(driver) -> CapturedSearchRequest | None:
+    # Needs a driver created with the performance log enabled, see prepare_driver(capture_network=True)
+    found = find_search_request(driver.get_log('performance'))
+    if found is None:
+        return None
+    request_id, request = found
+    post_data = request.get('postData')
+    if post_data is None:
+        # Chrome leaves large bodies out of the log, they are still available over CDP
+        post_data = driver.execute_cdp_cmd('Network.getRequestPostData', {'requestId': request_id})['postData']
+    return to_captured_request(request, post_data)
+
+
+def to_captured_request(request: dict, post_data: str) -> CapturedSearchRequest:
+    headers = {name: value for name, value in request['headers'].items()
+               if not name.startswith(':') and name.lower() not in SKIPPED_HEADERS}
+    return CapturedSearchRequest(request['url'], headers, json.loads(post_data))
+
+
+def build_page_body(body: dict, page: int) -> dict:
+    page_body = copy.deepcopy(body)
+    for query in page_body['requests']:
+        params = query.get('params', {})
+        if isinstance(params, str):
+            # Older clients send the query parameters url-encoded inside the JSON body
+            params = dict(parse_qsl(params, keep_blank_values=True))
+            params['page'] = str(page)
+            query['params'] = urlencode(params)
+        else:
+            query['params'] = {**params, 'page': page}
+    return page_body
+
+
+def create_pooled_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def fetch_search_page(session: requests.Session, search_request: CapturedSearchRequest, page: int) -> dict:
+    # The body is sent as a string so the captured Content-Type is kept as is
+    response = session.post(search_request.url, headers=search_request.headers,
+                            data=json.dumps(build_page_body(search_request.body, page)))
+    response.raise_for_status()
+    return response.json()['results'][0]
+
+
+def parse_jobs(result: dict, base_url: str = ROOT_URL) -> list[dict]:
+    return [
+        {
+            "title": hit[HIT_TITLE_FIELD].strip(),
+            "url": urljoin(base_url, hit[HIT_URL_FIELD])
+        }
+        for hit in result['hits']
+    ]
+
+
+@traced
+def replay_search(search_request: CapturedSearchRequest, page_count: int | None = None,
+                  max_workers: int = MAX_WORKERS, base_url: str = ROOT_URL) -> list[dict]:
+    # The first page tells how many pages exist, the rest are fetched concurrently and kept in page order
+    with create_pooled_session(max_workers) as session:
+        first_page = fetch_search_page(session, search_request, 0)
+        total_pages = first_page['nbPages'] if page_count is None else min(page_count, first_page['nbPages'])
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = executor.map(lambda page: fetch_search_page(session, search_request, page),
+                                   range(1, total_pages))
+            jobs = parse_jobs(first_page, base_url)
+            for result in results:
+                jobs += parse_jobs(result, base_url)
+    return jobs
@@ -0,0 +1,91 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, parse_qsl, urlparse
+
+from search_replay import SEARCH_REQUEST_PATH
+
+API_KEY = 'stub-search-key'
+APPLICATION_ID = 'STUBAPP'
+INDEX_NAME = 'prod_jobs'
+LOCATIONS = ['London', 'Manchester', 'Leeds', 'Bristol', 'Glasgow', 'Cardiff', 'Belfast', 'Birmingham']
+
+
+def render_hit(job_id: int) -> dict:
+    # Mirrors the shape of an Algolia hit: the fields the card renders plus search metadata
+    title = f'Customer Assistant {job_id} - Store {job_id % 40}'
+    return {
+        'objectID': str(100000 + job_id),
+        'title': title,
+        'url': f'/job-search/jobs/{100000 + job_id}',
+        'location': LOCATIONS[job_id % len(LOCATIONS)],
+        'category': 'Retail',
+        'description': 'Help our customers find what they need. ' * 10,
+        '_highlightResult': {'title': {'value': title, 'matchLevel': 'none', 'matchedWords': []}},
+    }
+
+
+def render_result(job_count: int, page: int, hits_per_page: int) -> dict:
+    first_job_id = page * hits_per_page
+    return {
+        'hits': [render_hit(job_id) for job_id in range(first_job_id, min(first_job_id + hits_per_page, job_count))],
+        'nbHits': job_count,
+        'page': page,
+        'nbPages': (job_count + hits_per_page - 1) // hits_per_page,
+        'hitsPerPage': hits_per_page,
+        'index': INDEX_NAME,
+    }
+
+
+def create_stub_server(job_count: int = 400, latency: float = 0.2, port: int = 0) -> ThreadingHTTPServer:
+    class StubHandler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+        disable_nagle_algorithm = True
+
+        def do_POST(self):
+            time.sleep(latency)
+            url = urlparse(self.path)
+            credentials = {**parse_qs(url.query), **{name.lower(): [value] for name, value in self.headers.items()}}
+            body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+            if url.path != SEARCH_REQUEST_PATH:
+                self.send_body({'message': 'Not found'}, 404)
+            elif credentials.get('x-algolia-api-key') != [API_KEY]:
+                self.send_body({'message': 'Invalid Application-ID or API key'}, 403)
+            else:
+                results = []
+                for query in json.loads(body)['requests']:
+                    params = query['params']
+                    if isinstance(params, str):
+                        params = dict(parse_qsl(params))
+                    results.append(render_result(job_count, int(params.get('page', 0)),
+                                                 int(params.get('hitsPerPage', 20))))
+                self.send_body({'results': results})
+
+        def send_body(self, payload: dict, status: int = 200):
+            body = json.dumps(payload).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=UTF-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', port), StubHandler)
+    server.daemon_threads = True
+    return server
+
+
+def start_stub_server(**kwargs) -> tuple[ThreadingHTTPServer, str]:
+    server = create_stub_server(**kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    host, port = server.server_address
+    return server, f'http://{host}:{port}'
+
+
+if __name__ == '__main__':
+    server = create_stub_server(port=8768)
+    print(f'Serving stub search endpoint on http://127.0.0.1:8768{SEARCH_REQUEST_PATH}')
+    server.serve_forever()